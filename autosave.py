@@ -0,0 +1,242 @@
+# This Python file uses the following encoding: utf-8
+'''Saving projects in the background and recovering unsaved edits after a crash
+
+Files are written to a temporary file next to the target and renamed over it,
+so a crash while saving never leaves a half-written project.
+
+Journal keeps snapshots of the project and every edit made after them:
+    <directory>/session-<pid>/journal-<n>.jsonl    {"file": path, "base": path}, then one edit per line
+    <directory>/session-<pid>/snapshot-<n>.cajs    project at the moment n, if it is not saved in "base" file
+    <directory>/session-<pid>/saved-<n>            marks that snapshot n is written completely
+    <directory>/session-<pid>.lock                 locked while the application writing the session runs
+A session left by a crashed application (its lock is free) is recovered by loading
+the newest complete snapshot and replaying journals from it on.
+'''
+import json
+import os
+import shutil
+from concurrent.futures import Future, ThreadPoolExecutor
+from tempfile import mkstemp
+
+from typing import Any, BinaryIO, Callable, Iterable, TextIO
+
+import cabin
+import cajs
+
+
+UMASK = os.umask(0)     # Permissions new files get, read once as it can be read only by setting it
+os.umask(UMASK)
+
+
+def atomic_write(path: str, write: Callable[[Any], None], binary: bool = False) -> None:
+    '''Writing file through a temporary file which replaces the target when complete'''
+    directory, name = os.path.split(os.path.abspath(path))
+    fd, temp = mkstemp(prefix=f'.{name}.', suffix='.tmp', dir=directory)
+    try:
+        with open(fd, 'wb' if binary else 'wt', encoding=None if binary else 'utf-8') as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        try:    # Temporary file is readable only by its owner
+            shutil.copymode(path, temp)
+        except FileNotFoundError:
+            os.chmod(temp, 0o666 & ~UMASK)
+        os.replace(temp, path)
+    except BaseException:
+        os.remove(temp)
+        raise
+
+
+def write_project(path: str, tables: Iterable[dict]) -> None:
+    '''Writing tables to .cajs or .cabin file atomically'''
+    if path.endswith('.cabin'):
+        atomic_write(path, lambda f: cabin.write_tables(f, tables), binary=True)
+    else:
+        atomic_write(path, lambda f: cajs.write_tables(f, tables))
+
+
+class Writer:
+    '''Writes projects one after another in a background thread'''
+    def __init__(self) -> None:
+        self.executor = ThreadPoolExecutor(1, thread_name_prefix='calcarea-save')
+
+    def submit(self, path: str, tables: Iterable[dict], done: Callable[[str, BaseException], None] = None) -> Future:
+        '''Writing tables (must not change after the call, see Sheet.snapshot),
+        done is called from the background thread with the path and an error or None'''
+        def task() -> None:
+            try:
+                write_project(path, tables)
+            except BaseException as e:
+                if done:
+                    done(path, e)
+                raise
+            if done:
+                done(path, None)
+        return self.executor.submit(task)
+
+    def run(self, task: Callable, *args) -> Future:
+        '''Running task in the background thread after all submitted files are written'''
+        return self.executor.submit(task, *args)
+
+    def wait(self) -> None:
+        '''Waiting for all submitted files to be written'''
+        self.executor.submit(lambda: None).result()
+
+
+class Journal:
+    '''Snapshots of the project and edits made after them, for recovery after a crash'''
+    def __init__(self, directory: str, writer: Writer) -> None:
+        self.root = directory
+        self.directory = os.path.join(directory, f'session-{os.getpid()}')
+        self.writer = writer
+        self.generation = 0
+        self.file: TextIO = None
+        self.lock: BinaryIO = None  # Locked file telling other runs of the application that the session is not left
+        self.edits = 0      # Edits since the last snapshot
+
+    def _next(self, current_file: str, base: str) -> int:
+        '''Starting journal of the next generation'''
+        if self.lock is None:   # Locked before the session is created, so it is never taken for a crashed one
+            os.makedirs(self.root, exist_ok=True)
+            self.lock = open(self.directory + '.lock', 'ab')
+            _lock(self.lock)
+        os.makedirs(self.directory, exist_ok=True)
+        self.generation += 1
+        if self.file:
+            self.file.close()
+        self.file = open(os.path.join(self.directory, f'journal-{self.generation}.jsonl'), 'wt', encoding='utf-8')
+        self.file.write(json.dumps({"file": current_file, "base": base}) + '\n')
+        self.file.flush()
+        self.edits = 0
+        return self.generation
+
+    def _complete(self, generation: int) -> None:
+        '''Marking snapshot as complete and deleting older snapshots and journals'''
+        open(os.path.join(self.directory, f'saved-{generation}'), 'wb').close()
+        for name in os.listdir(self.directory):
+            if _generation(name) < generation:
+                os.remove(os.path.join(self.directory, name))
+
+    def snapshot(self, tables: Iterable[dict], current_file: str = None, path: str = None,
+                 done: Callable[[str, BaseException], None] = None) -> Future:
+        '''Writing tables in the background to the path (or to the session if not given)
+        and journaling next edits after them, done is called as in Writer.submit'''
+        generation = self._next(current_file, path)
+        if path is None:
+            path = os.path.join(self.directory, f'snapshot-{generation}.cajs')
+
+        def finished(path: str, error: BaseException) -> None:
+            if error is None:
+                self._complete(generation)
+            if done:
+                done(path, error)
+        return self.writer.submit(path, tables, finished)
+
+    def start(self, path: str) -> None:
+        '''Journaling next edits after the project already saved in the file'''
+        self._complete(self._next(path, path))
+
+    def append(self, edit: list) -> None:
+        '''Journaling an edit, it reaches the system before the next one is made'''
+        if self.file:
+            self.file.write(json.dumps(edit) + '\n')
+            self.file.flush()
+            self.edits += 1
+
+    def close(self) -> None:
+        '''Deleting the session after the application is closed normally'''
+        if self.file:
+            self.file.close()
+            self.file = None
+        self.writer.wait()
+        shutil.rmtree(self.directory, ignore_errors=True)
+        if self.lock:
+            self.lock.close()
+            self.lock = None
+            os.remove(self.directory + '.lock')
+
+    def sessions(self) -> list[str]:
+        '''Sessions left by crashed runs of the application, the newest first
+        (sessions of other running instances are locked and skipped)'''
+        if not os.path.isdir(self.root):
+            return []
+        paths = [os.path.join(self.root, name) for name in os.listdir(self.root) if name.startswith('session-')]
+        paths = [path for path in paths if path != self.directory and os.path.isdir(path) and not _running(path)]
+        return sorted(paths, key=os.path.getmtime, reverse=True)
+
+    @staticmethod
+    def recover(session: str) -> tuple[str, list[dict], list[list]]:
+        '''Path of the project file, tables of the newest complete snapshot and edits made after it'''
+        journals = []   # Generation, header and edits
+        for generation in sorted(_generation(name) for name in os.listdir(session) if name.startswith('journal-')):
+            with open(os.path.join(session, f'journal-{generation}.jsonl'), 'rt', encoding='utf-8') as f:
+                lines = []
+                for line in f:
+                    try:
+                        lines.append(json.loads(line))
+                    except ValueError:  # Line cut by the crash
+                        break
+            if lines:
+                journals.append((generation, lines[0], lines[1:]))
+
+        for i in range(len(journals)-1, -1, -1):
+            generation, header, _ = journals[i]
+            if not os.path.exists(os.path.join(session, f'saved-{generation}')):
+                continue    # Snapshot was not written completely
+            path = header["base"] or os.path.join(session, f'snapshot-{generation}.cajs')
+            try:
+                tables = read_project(path)
+            except (OSError, ValueError):
+                continue
+            edits = [edit for _, _, lines in journals[i:] for edit in lines]
+            return journals[-1][1]["file"], tables, edits
+        raise ValueError('No complete snapshot in the session')
+
+    @staticmethod
+    def discard(session: str) -> None:
+        '''Deleting the session left by a crashed run'''
+        shutil.rmtree(session, ignore_errors=True)
+        try:
+            os.remove(session + '.lock')
+        except OSError:     # Session of an older version without lock
+            pass
+
+
+def read_project(path: str) -> list[dict]:
+    '''Tables of .cajs or .cabin file'''
+    if path.endswith('.cabin'):
+        with open(path, 'rb') as f:
+            return list(cabin.iter_tables(f))
+    with open(path, 'rt', encoding='utf-8') as f:
+        return list(cajs.iter_tables(f))
+
+
+def _lock(f: BinaryIO) -> bool:
+    '''Locking the open file until it is closed or the process exits, False if another process holds the lock'''
+    try:
+        if os.name == 'nt':
+            import msvcrt
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+def _running(session: str) -> bool:
+    '''Whether the application writing the session still runs'''
+    try:
+        with open(session + '.lock', 'ab') as f:
+            return not _lock(f)     # Lock is released when the file is closed
+    except OSError:
+        return True
+
+
+def _generation(name: str) -> int:
+    '''Number of snapshot or journal by its file name'''
+    try:
+        return int(name.split('-', 1)[1].split('.', 1)[0])
+    except (IndexError, ValueError):
+        return 0
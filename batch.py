@@ -0,0 +1,98 @@
+# This Python file uses the following encoding: utf-8
+'''Recounting many .cajs and .cabin files without the GUI
+
+Usage:
+    python batch.py archive/ -o report.csv
+    python batch.py "archive/**/*.cajs" -o report.json --jobs 8
+'''
+import argparse
+import csv
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from glob import glob
+
+from calc import load_project, sum_floors
+
+
+FIELDS = ('file', 'table', 'rows', 'total', 'dwelling', 'economical', 'error')
+
+
+def find_files(patterns: list[str]) -> list[str]:
+    '''Project files matching given directories and glob patterns'''
+    files = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):  # Whole directory with its subdirectories
+            for ext in ('*.cajs', '*.cabin'):
+                files.extend(sorted(glob(os.path.join(pattern, '**', ext), recursive=True)))
+        else:
+            files.extend(sorted(glob(pattern, recursive=True)))
+    return list(dict.fromkeys(files))   # Removing duplicates keeping the order
+
+
+def count_file(path: str) -> list[dict]:
+    '''Report rows of every table of the file and of the whole project'''
+    try:
+        sheets = load_project(path)
+    except Exception as e:
+        return [{'file': path, 'error': f'{type(e).__name__}: {e}'}]
+
+    report = []
+    for sheet in sheets:
+        area_total, area_dw = sheet.sums
+        report.append({'file': path, 'table': sheet.name, 'rows': sheet.rows,
+                       'total': str(area_total), 'dwelling': str(area_dw), 'economical': str(area_total - area_dw)})
+
+    sum_total, sum_dwelling, sum_economical = sum_floors(sheets)
+    report.append({'file': path, 'table': '*', 'rows': sum(sheet.rows for sheet in sheets),
+                   'total': str(sum_total), 'dwelling': str(sum_dwelling), 'economical': str(sum_economical)})
+    return report
+
+
+def write_report(report: list[dict], path: str = None) -> None:
+    '''Writing report as JSON if path ends with .json, otherwise as CSV (to stdout if no path given)'''
+    f = open(path, 'wt', encoding='utf-8', newline='') if path else sys.stdout
+    try:
+        if path and path.lower().endswith('.json'):
+            json.dump(report, f, ensure_ascii=False, indent=1)
+        else:
+            writer = csv.DictWriter(f, FIELDS)
+            writer.writeheader()
+            writer.writerows(report)
+    finally:
+        if path:
+            f.close()
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='Recount areas of .cajs and .cabin files and write summary report')
+    parser.add_argument('paths', nargs='+', help='directories or glob patterns of .cajs and .cabin files')
+    parser.add_argument('-o', '--output', help='report file (.csv or .json), CSV to stdout if not given')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='number of worker processes (all CPUs by default)')
+    args = parser.parse_args(argv)
+
+    files = find_files(args.paths)
+    if not files:
+        print('No files found', file=sys.stderr)
+        return 1
+
+    report = []
+    if args.jobs == 1:
+        for path in files:
+            report.extend(count_file(path))
+    else:
+        with ProcessPoolExecutor(args.jobs) as executor:
+            # Big chunks so small files are not dominated by inter-process communication
+            chunksize = max(1, len(files) // ((args.jobs or os.cpu_count() or 1) * 4))
+            for rows in executor.map(count_file, files, chunksize=chunksize):
+                report.extend(rows)
+
+    write_report(report, args.output)
+    failed = sum(1 for row in report if row.get('error'))
+    print(f'{len(files)} files counted, {failed} failed', file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
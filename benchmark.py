@@ -0,0 +1,380 @@
+# This Python file uses the following encoding: utf-8
+'''Benchmarks of table hot paths
+
+Run without a display:
+    QT_QPA_PLATFORM=offscreen python benchmark.py
+    QT_QPA_PLATFORM=offscreen python benchmark.py --rows 1000 10000 --ops update load --json results.json
+    QT_QPA_PLATFORM=offscreen python benchmark.py --engine fixed --verify 1000
+    QT_QPA_PLATFORM=offscreen python benchmark.py --startup 5 --rows 10000 --floors 20 --ops
+    QT_QPA_PLATFORM=offscreen python benchmark.py --ops count_floors --floors 30 --jobs 1 4
+'''
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import get_context
+from random import Random
+from tempfile import TemporaryDirectory, mkdtemp
+from time import perf_counter
+from typing import Callable, Iterator
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import PySide6
+from PySide6.QtWidgets import QApplication, QTableView, QCheckBox
+from PySide6.QtCore import QItemSelection, QItemSelectionModel
+
+import autosave
+import calc
+import clipboard
+from calc import Sheet
+from mainwindow import MainWindow, Table
+
+
+def generate(rows: int, seed: int = 0, composite: float = 0.4, dwelling: float = 1/3, name: str = "MAIN") -> dict:
+    '''Generates synthetic table in the format of .cajs file
+    with given share of composite ('+' and '-') rows and of dwelling rows'''
+    random = Random(seed)
+    matrix = []
+    for row in range(rows):
+        if row and random.random() < composite:
+            letter = random.choice(('+', '-'))
+        else:
+            letter = random.choice(('A', 'B', 'C'))
+        matrix.append([letter] + [f'{random.uniform(0.5, 20):.2f}' for col in range(3)])
+    dw_rows = [row for row in range(rows) if random.random() < dwelling]
+    return {"name": name, "table": matrix, "dw_rows": dw_rows}
+
+
+def random_value(random: Random) -> str:
+    '''Cell text likely to hit rounding edge cases: halves, long fractions, big numbers and typos'''
+    kind = random.random()
+    if kind < 0.05:
+        return random.choice(('', '0', '-0', 'abc', '1e3', '1,5', '.5', '+2', ' 3.5 '))
+    if kind < 0.25:
+        return f'{random.randint(0, 9)}.{random.choice(("005", "015", "045", "0049999999", "00500000001"))}'
+    if kind < 0.45:
+        return f'{random.randint(0, 20)}.{random.randint(0, 10**random.randint(3, 12))}'
+    if kind < 0.5:
+        return f'{random.randint(10**6, 10**9)}.{random.randint(0, 99)}'
+    return f'{random.uniform(-5, 30):.2f}'
+
+
+def state(sheet: Sheet) -> tuple:
+    '''Displayed cells, area sums and dwelling rows of the sheet'''
+    cells = [[sheet.columns[col].display(sheet.value(row, col)) for col in range(sheet.cols)] for row in range(sheet.rows)]
+    return cells, [str(area) for area in sheet.sums], sorted(sheet.dw_rows)
+
+
+def verify_engines(cases: int, seed: int = 0) -> int:
+    '''Counting random tables by every engine and editing them in the same way,
+    returns amount of tables counted differently from Sheet'''
+    failed = 0
+    for case in range(cases):
+        random = Random(seed + case)
+        rows = random.randint(0, 30)
+        table = {"table": [[random.choice(('+', '-', '')) * (row > 0) + random.choice(('A', 'B', ''))]
+                           + [random_value(random) for col in range(3)] for row in range(rows)],
+                 "dw_rows": [row for row in range(rows) if random.random() < 0.5]}
+        sheets = [engine() for engine in calc.ENGINES.values()]
+        for sheet in sheets:
+            sheet.load(table)
+        for _ in range(10):     # Random edits of the same cells
+            if not sheets[0].rows:
+                break
+            row, col = random.randrange(sheets[0].rows), random.randrange(4)
+            value = random_value(random) if col else random.choice(('A', '+', '-', '+B', ''))
+            dwelling = random.random() < 0.5
+            for sheet in sheets:
+                sheet.set_value(row, col, value)
+                sheet.set_dwelling(row, dwelling)
+                sheet.recalculate(row-1, row)
+        expected = state(sheets[0])
+        failed += any(state(sheet) != expected for sheet in sheets[1:])
+    return failed
+
+
+def verify_edits(cases: int, seed: int = 0) -> int:
+    '''Editing random tables as the user does, with recalculation of the changed rows only,
+    returns amount of tables counted differently from the whole table counted again'''
+    failed = 0
+    for case in range(cases):
+        random = Random(seed + case)
+        table = Table(QTableView(), QCheckBox())
+        table.load(generate(random.randint(1, 30), seed + case, composite=0.5))
+        for _ in range(10):
+            if not table.rows:
+                break
+            edit = random.random()
+            if edit < 0.4:  # Removing rows, the top one often
+                rows = {0} if random.random() < 0.5 else set()
+                rows.update(random.sample(range(table.rows), random.randint(1, min(3, table.rows))))
+                table.remove_rows(sorted(rows, reverse=True))
+            elif edit < 0.6:
+                table.insert_row(random.randrange(table.rows+1))
+            else:
+                row, col = random.randrange(table.rows), random.randrange(4)
+                # Numbers below a million, bigger ones are nudged by rounding again when the table is counted again
+                value = random.choice(('', '0', 'abc', '1,5', '2.005', f'{random.uniform(-5, 30):.3f}')) if col else random.choice(('A', '+', '-', '+B', ''))
+                table[row, col] = value
+        table.flush()
+        expected = calc.new_sheet()
+        expected.load({"table": table.sheet.get_matrix(), "dw_rows": table.sheet.dw_rows})
+        failed += state(table.sheet) != state(expected)
+    return failed
+
+
+def loaded_table(options: argparse.Namespace, rows: int) -> Table:
+    '''Table filled with synthetic data'''
+    table = Table(QTableView(), QCheckBox())
+    table.load(generate(rows, options.seed, options.composite, options.dwelling))
+    return table
+
+
+def select_rows(table: Table, first: int, last: int) -> None:
+    '''Selecting rows without triggering highlighting'''
+    view = table._Table__table
+    model = view.model()
+    selection = view.selectionModel()
+    selection.blockSignals(True)
+    selection.select(QItemSelection(model.index(first, 0), model.index(last, table.cols-1)), QItemSelectionModel.ClearAndSelect)
+    selection.blockSignals(False)
+
+
+# Each benchmark prepares its data and returns the operation to time
+
+def bench_load(options: argparse.Namespace, rows: int) -> Callable:
+    table = Table(QTableView(), QCheckBox())
+    data = generate(rows, options.seed, options.composite, options.dwelling)
+    return lambda: table.load(data)
+
+def bench_update(options: argparse.Namespace, rows: int) -> Callable:
+    return loaded_table(options, rows).update
+
+def bench_get_matrix(options: argparse.Namespace, rows: int) -> Callable:
+    return loaded_table(options, rows).get_matrix
+
+def bench_highlight_row(options: argparse.Namespace, rows: int) -> Callable:
+    table = loaded_table(options, rows)
+    select_rows(table, rows // 4, rows // 4 + max(1, rows // 10))  # A tenth of the table is selected
+    return table.highlight_row
+
+def bench_remove_current_row(options: argparse.Namespace, rows: int) -> Callable:
+    table = loaded_table(options, rows)
+    select_rows(table, rows // 2, rows // 2 + max(1, rows // 100))  # A hundredth of the table is removed
+    table.highlight_row()
+    return table.remove_current_row
+
+def bench_set_dwelling(options: argparse.Namespace, rows: int) -> Callable:
+    table = loaded_table(options, rows)
+    select_rows(table, 0, rows-1)   # Whole table is marked as dwelling
+    table.highlight_row()
+    return lambda: table.set_dwelling(table.hrows, True)
+
+def bench_batch_edit(options: argparse.Namespace, rows: int) -> Callable:
+    table = loaded_table(options, rows)
+    def operation() -> None:
+        with table.batch():
+            for row in range(0, rows, 10):  # A tenth of rows is edited
+                table[row, 1] = '1.50'
+    return operation
+
+def bench_paste(options: argparse.Namespace, rows: int) -> Callable:
+    table = loaded_table(options, rows)
+    text = clipboard.write_range(table.sheet.iter_matrix())     # The whole table is pasted over itself
+    return lambda: table.paste_range(0, 0, clipboard.read_range(text))
+
+def bench_copy(options: argparse.Namespace, rows: int) -> Callable:
+    table = loaded_table(options, rows)
+    select_rows(table, 0, rows-1)
+    return table.copy
+
+def bench_open_file(options: argparse.Namespace, rows: int) -> Callable:
+    tables = [generate(rows, options.seed + i, options.composite, options.dwelling, name=f"Floor {i}" if i else "MAIN")
+              for i in range(options.floors + 1)]
+    path = os.path.join(options.tmpdir, f'benchmark_{rows}.cajs')
+    with open(path, 'wt', encoding='utf-8') as f:
+        json.dump(tables, f)
+    window = MainWindow()
+    # Sessions of benchmark windows are kept out of the user's recovery, every window has its own one
+    window.journal = autosave.Journal(mkdtemp(dir=options.tmpdir), window.writer)
+    windows.append(window)
+    def operation() -> None:
+        window.open_file(path=path)
+        window.wait_opened()
+    return operation
+
+
+windows: list[MainWindow] = []  # Windows made by bench_open_file, their journals are closed when benchmarks are done
+
+
+@contextmanager
+def processes(jobs: int) -> Iterator[ProcessPoolExecutor | None]:
+    '''Started processes counting floors, None if they are counted one by one'''
+    if jobs == 1:
+        yield None
+        return
+    with ProcessPoolExecutor(jobs, mp_context=get_context('spawn')) as executor:
+        list(calc.count_tables([generate(1)] * jobs, executor))     # Processes are started before timing
+        yield executor
+
+def bench_count_floors(options: argparse.Namespace, rows: int) -> Callable:
+    tables = [generate(rows, options.seed + i, options.composite, options.dwelling, name=f"Floor {i}" if i else "MAIN")
+              for i in range(options.floors + 1)]
+    return lambda: list(calc.count_tables(tables, options.executor))
+
+
+BENCHMARKS = {
+    'load': bench_load,
+    'update': bench_update,
+    'get_matrix': bench_get_matrix,
+    'highlight_row': bench_highlight_row,
+    'remove_current_row': bench_remove_current_row,
+    'set_dwelling': bench_set_dwelling,
+    'batch_edit': bench_batch_edit,
+    'paste': bench_paste,
+    'copy': bench_copy,
+    'open_file': bench_open_file,
+    'count_floors': bench_count_floors,
+}
+
+
+# Application started in a new process, prints a line when the window is shown and when the file is opened
+STARTUP = '''
+import sys
+from PySide6.QtWidgets import QApplication
+from mainwindow import MainWindow
+app = QApplication(sys.argv)
+window = MainWindow()
+window.show()
+app.processEvents()
+print('shown', flush=True)
+if window.startup_file:
+    window.open_file(path=window.startup_file)
+    window.wait_opened()
+print('opened', flush=True)
+window.journal.close()
+'''
+
+
+def measure_startup(options: argparse.Namespace, rows: int = 0) -> dict:
+    '''Best time from starting the application until its window is shown and until the file
+    given in the command line (if rows are given) is opened'''
+    args = [sys.executable, '-c', STARTUP]
+    if rows:
+        tables = [generate(rows, options.seed + i, options.composite, options.dwelling, name=f"Floor {i}" if i else "MAIN")
+                  for i in range(options.floors + 1)]
+        path = os.path.join(options.tmpdir, f'startup_{rows}.cajs')
+        with open(path, 'wt', encoding='utf-8') as f:
+            json.dump(tables, f)
+        args.append(path)
+
+    shown, opened = [], []
+    for _ in range(options.startup):
+        start = perf_counter()
+        with subprocess.Popen(args, stdout=subprocess.PIPE, text=True, cwd=os.path.dirname(os.path.abspath(__file__))) as process:
+            for line in process.stdout:
+                if line.strip() == 'shown':
+                    shown.append(perf_counter() - start)
+                elif line.strip() == 'opened':
+                    opened.append(perf_counter() - start)
+        if process.returncode:
+            raise RuntimeError(f'Application exited with code {process.returncode}')
+    return {'op': 'startup', 'rows': rows, 'seconds': min(shown), 'opened_seconds': min(opened), 'times': shown}
+
+
+def measure(options: argparse.Namespace, op: str, rows: int) -> dict:
+    '''Best time of the operation over repeats and its peak memory'''
+    times = []
+    peak = None
+    for _ in range(options.repeat):
+        operation = BENCHMARKS[op](options, rows)
+        start = perf_counter()
+        operation()
+        times.append(perf_counter() - start)
+
+    if options.memory:  # Separate run, because tracing slows the operation down
+        operation = BENCHMARKS[op](options, rows)
+        tracemalloc.start()
+        operation()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {'op': op, 'rows': rows, 'seconds': min(times), 'times': times, 'peak_bytes': peak}
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark table hot paths on synthetic surveys')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 10_000, 100_000], help='table sizes')
+    parser.add_argument('--ops', nargs='*', choices=BENCHMARKS, default=list(BENCHMARKS), help='operations to time')
+    parser.add_argument('--composite', type=float, default=0.4, help="share of composite ('+' and '-') rows")
+    parser.add_argument('--dwelling', type=float, default=1/3, help='share of dwelling rows')
+    parser.add_argument('--floors', type=int, default=1, help='floors besides MAIN in the file for open_file and count_floors')
+    parser.add_argument('--jobs', type=int, nargs='+', default=[1], help='processes counting floors in count_floors, 1 counts them one by one')
+    parser.add_argument('--repeat', type=int, default=1, help='runs of each operation, the best one is reported')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--engine', choices=calc.ENGINES, default=calc.engine, help='counting engine of tables')
+    parser.add_argument('--verify', type=int, default=0, metavar='CASES',
+                        help='first check that all engines and edits of the table count given amount of random tables the same')
+    parser.add_argument('--startup', type=int, default=0, metavar='RUNS',
+                        help='time starting the application given times, empty and with a file of every size of --rows')
+    parser.add_argument('--no-memory', dest='memory', action='store_false', help='skip peak memory measurement')
+    parser.add_argument('--json', help='file to write results to')
+    options = parser.parse_args(argv)
+    calc.engine = options.engine
+
+    app = QApplication.instance() or QApplication([sys.argv[0]])
+
+    if options.verify:
+        failed = verify_engines(options.verify, options.seed)
+        print(f'engines differ on {failed} of {options.verify} random tables')
+        edited = verify_edits(options.verify, options.seed)
+        print(f'edits are counted differently from the whole table on {edited} of {options.verify} random tables')
+        if failed or edited:
+            return 1
+
+    results = []
+    with TemporaryDirectory() as options.tmpdir:
+        for op in options.ops:
+            for jobs in (options.jobs if op == 'count_floors' else [1]):
+                label = f'{op} x{jobs}' if op == 'count_floors' else op
+                with processes(jobs) as options.executor:
+                    for rows in options.rows:
+                        result = measure(options, op, rows) | {'jobs': jobs}
+                        results.append(result)
+                        memory = f", peak {result['peak_bytes']/2**20:8.1f} MiB" if options.memory else ''
+                        print(f"{label:>18} {rows:>7} rows: {result['seconds']*1000:10.1f} ms, {result['seconds']/rows*1e6:6.1f} us/row{memory}", flush=True)
+        while windows:
+            windows.pop().journal.close()
+
+        if options.startup:
+            for rows in (0, *options.rows):
+                result = measure_startup(options, rows)
+                results.append(result)
+                print(f"{'startup':>18} {rows:>7} rows: {result['seconds']*1000:10.1f} ms to window shown, "
+                      f"{result['opened_seconds']*1000:.1f} ms to file opened", flush=True)
+    del options.tmpdir
+    options.__dict__.pop('executor', None)
+
+    if options.json:
+        with open(options.json, 'wt', encoding='utf-8') as f:
+            json.dump({'python': platform.python_version(), 'pyside': PySide6.__version__, 'platform': platform.platform(),
+                       'options': vars(options), 'results': results}, f, indent=1)
+
+    # Linear scaling: time per row at 10k rows must stay close to time per row at 1k rows
+    update = {result['rows']: result['seconds'] for result in results if result['op'] == 'update'}
+    if 1_000 in update and 10_000 in update:
+        ratio = (update[10_000] / 10_000) / (update[1_000] / 1_000)
+        print(f'update() time per row ratio 10k/1k: {ratio:.2f}')
+        if ratio >= 3:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
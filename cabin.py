@@ -0,0 +1,223 @@
+# This Python file uses the following encoding: utf-8
+'''Compact binary project format (.cabin)
+
+Little-endian layout:
+    header      b'CABN', version u16, reserved u16, index offset u64
+    sections    one per table, 8-byte aligned:
+                rows u32, strings u32, strings (u32 length + utf-8 each),
+                letters (u32 index into strings per row),
+                width, length, height (i64 per row, value * 100),
+                dw_rows bitmap (bit per row)
+    index       tables u32, per table: section offset u64, rows u32,
+                name, total and dwelling area (u32 length + utf-8 each)
+
+Numbers are kept as fixed-point integers, so files saved by the application
+round-trip to .cajs exactly. Sections are read through mmap without copying the file.
+'''
+import sys
+from array import array
+from decimal import Decimal as Dec
+from mmap import mmap, ACCESS_READ
+from struct import Struct
+
+from typing import BinaryIO, Iterable, Iterator
+
+
+MAGIC = b'CABN'
+VERSION = 1
+SCALE = 2   # Decimal places of width, length and height
+
+HEADER = Struct('<4sHHQ')
+U32 = Struct('<I')
+U64 = Struct('<Q')
+SECTION = Struct('<II')
+FIXED_MAX = 2**63 - 1     # Largest number of hundredths stored in i64, the least one is -FIXED_MAX-1
+
+
+def _pad(size: int) -> bytes:
+    '''Zero bytes to align the size to 8'''
+    return bytes(-size % 8)
+
+
+def _text(text: str) -> bytes:
+    data = str(text).encode('utf-8')
+    return U32.pack(len(data)) + data
+
+
+def _fixed(value) -> int:
+    '''Value of the cell as integer number of hundredths'''
+    num = Dec(str(value) or '0').scaleb(SCALE)
+    if num != num.to_integral_value():
+        raise ValueError(f'{value!r} has more than {SCALE} decimal places')
+    if not -FIXED_MAX-1 <= num <= FIXED_MAX:
+        raise ValueError(f'{value!r} is too big for .cabin file, save it as .cajs')
+    return int(num)
+
+
+def write_tables(f: BinaryIO, tables: Iterable[dict]) -> None:
+    '''Writing tables {"name", "table", "dw_rows", "sums"} to seekable binary file,
+    "sums" (total and dwelling area) are optional'''
+    start = f.tell()
+    f.write(HEADER.pack(MAGIC, VERSION, 0, 0))
+    pos = HEADER.size
+
+    index = []
+    for table in tables:
+        strings: dict[str, int] = dict()    # Index of every distinct letter
+        letters = array('I')
+        columns = (array('q'), array('q'), array('q'))
+        for i, row in enumerate(table["table"]):
+            letter, *numbers = row
+            letters.append(strings.setdefault(str(letter), len(strings)))
+            for col, (column, value) in enumerate(zip(columns, numbers), 2):
+                try:
+                    column.append(_fixed(value))
+                except ValueError as e:     # Naming the cell, as the table is written as a whole
+                    raise ValueError(f'{table["name"]}, row {i+1}, column {col}: {e}') from None
+            for column in columns[len(numbers):]:   # Rows without some of the columns
+                column.append(0)
+        rows = len(letters)
+
+        bitmap = bytearray((rows + 7) // 8)
+        for row in table["dw_rows"]:
+            bitmap[row >> 3] |= 1 << (row & 7)
+
+        if sys.byteorder != 'little':
+            for column in (letters, *columns):
+                column.byteswap()
+
+        section = bytearray(SECTION.pack(rows, len(strings)))
+        for string in strings:
+            section += _text(string)
+        section += _pad(len(section))
+        section += letters.tobytes()
+        section += _pad(len(section))
+        for column in columns:
+            section += column.tobytes()
+        section += bitmap
+        section += _pad(len(section))
+
+        total, dwelling = table.get("sums", ('', ''))
+        index.append(U64.pack(pos) + U32.pack(rows) + _text(table["name"]) + _text(total) + _text(dwelling))
+        f.write(section)
+        pos += len(section)
+
+    f.write(U32.pack(len(index)))
+    for entry in index:
+        f.write(entry)
+
+    end = f.tell()
+    f.seek(start)
+    f.write(HEADER.pack(MAGIC, VERSION, 0, pos))
+    f.seek(end)
+
+
+class Archive:
+    '''Memory mapped .cabin file with random access to its tables'''
+    def __init__(self, f: BinaryIO) -> None:
+        self.map = mmap(f.fileno(), 0, access=ACCESS_READ)
+        magic, version, _, pos = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC:
+            raise ValueError('Not a .cabin file')
+        if version > VERSION:
+            raise ValueError(f'.cabin version {version} is not supported')
+
+        # Index of sections: offset, rows, name, total and dwelling area
+        self.index: list[tuple[int, int, str, str, str]] = []
+        count, = U32.unpack_from(self.map, pos)
+        pos += U32.size
+        for _ in range(count):
+            offset, = U64.unpack_from(self.map, pos)
+            rows, = U32.unpack_from(self.map, pos + U64.size)
+            pos += U64.size + U32.size
+            texts = []
+            for _ in range(3):
+                text, pos = self._text(pos)
+                texts.append(text)
+            self.index.append((offset, rows, *texts))
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __iter__(self) -> Iterator[dict]:
+        return (self[i] for i in range(len(self)))
+
+    def __enter__(self) -> Archive:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.map.close()
+
+    @property
+    def names(self) -> list[str]:
+        '''Names of tables'''
+        return [entry[2] for entry in self.index]
+
+    def sums(self, i: int) -> tuple[Dec, Dec] | None:
+        '''Total and dwelling area saved for the table, None if they were not saved'''
+        total, dwelling = self.index[i][3:]
+        if not total:
+            return None
+        return Dec(total), Dec(dwelling)
+
+    def _text(self, pos: int) -> tuple[str, int]:
+        size, = U32.unpack_from(self.map, pos)
+        pos += U32.size
+        return self.map[pos:pos+size].decode('utf-8'), pos + size
+
+    def _array(self, code: str, pos: int, count: int) -> list[int]:
+        '''Integers stored from pos, read without copying the file'''
+        size = array(code).itemsize * count
+        if sys.byteorder != 'little':
+            values = array(code, self.map[pos:pos+size])
+            values.byteswap()
+            return values.tolist()
+        with memoryview(self.map) as view, view[pos:pos+size] as raw, raw.cast(code) as values:
+            return values.tolist()
+
+    def __getitem__(self, i: int) -> dict:
+        '''Table in the form of .cajs, numbers are already parsed'''
+        pos, _, name = self.index[i][:3]
+        rows, count = SECTION.unpack_from(self.map, pos)
+        pos += SECTION.size
+
+        strings = []
+        for _ in range(count):
+            string, pos = self._text(pos)
+            strings.append(string)
+        pos += -pos % 8
+
+        letters = self._array('I', pos, rows)
+        pos += 4*rows
+        pos += -pos % 8
+        columns = []
+        for _ in range(3):
+            columns.append([Dec(num).scaleb(-SCALE) for num in self._array('q', pos, rows)])
+            pos += 8*rows
+
+        bitmap = self.map[pos:pos + (rows + 7) // 8]
+        dw_rows = [row for row in range(rows) if bitmap[row >> 3] >> (row & 7) & 1]
+
+        matrix = list(zip([strings[letter] for letter in letters], *columns))
+        return {"name": name, "table": matrix, "dw_rows": dw_rows}
+
+
+def iter_tables(f: BinaryIO) -> Iterator[dict]:
+    '''Yielding tables of the file one by one'''
+    with Archive(f) as archive:
+        yield from archive
+
+
+if __name__ == "__main__":
+    # Converting between .cajs and .cabin: python cabin.py project.cajs [project.cabin]
+    from calc import load_project, save_project
+
+    source = sys.argv[1]
+    if len(sys.argv) > 2:
+        target = sys.argv[2]
+    else:
+        target = source.rsplit('.', 1)[0] + ('.cajs' if source.endswith('.cabin') else '.cabin')
+    save_project(target, load_project(source))
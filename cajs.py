@@ -0,0 +1,92 @@
+# This Python file uses the following encoding: utf-8
+'''Streaming reader and writer of .cajs files
+
+A .cajs file is a JSON list of tables {"name", "table", "dw_rows"}.
+Tables are read and written one at a time, so memory is bounded by the biggest table.
+'''
+from json import JSONDecoder, dumps
+
+from typing import Iterable, Iterator, TextIO
+
+
+CHUNK = 1 << 16     # Characters read from the file at once
+
+_decoder = JSONDecoder()
+
+
+def iter_tables(f: TextIO) -> Iterator:
+    '''Yielding elements of JSON list in the file one by one as they are parsed'''
+    buffer = ''
+    pos = 0
+    eof = False
+
+    def more(size: int) -> bool:
+        '''Reading more characters to the buffer, False at the end of file'''
+        nonlocal buffer, pos, eof
+        chunk = f.read(size)
+        if not chunk:
+            eof = True
+            return False
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        return True
+
+    def skip() -> str:
+        '''Skipping whitespace, returns next character'''
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos].isspace():
+                pos += 1
+            if pos < len(buffer) or not more(CHUNK):
+                return buffer[pos] if pos < len(buffer) else ''
+
+    if skip() != '[':
+        raise ValueError('.cajs file must contain a list of tables')
+    pos += 1
+
+    first = True
+    while True:
+        char = skip()
+        if char == ']':
+            return
+        if not first:   # Elements are separated by commas
+            if char != ',':
+                raise ValueError(f'Expected "," or "]" in .cajs file, got {char!r}')
+            pos += 1
+            char = skip()
+        if not char:
+            raise ValueError('Unexpected end of .cajs file')
+        first = False
+
+        # Reading until the whole element is in the buffer,
+        # doubling the read size so big tables are not parsed again too many times
+        size = CHUNK
+        while True:
+            try:
+                element, end = _decoder.raw_decode(buffer, pos)
+            except ValueError:
+                if eof or not more(max(size, len(buffer))):
+                    raise
+                size *= 2
+                continue
+            # A number at the end of the buffer may be cut
+            if end == len(buffer) and not eof and more(CHUNK):
+                continue
+            break
+        pos = end
+        yield element
+
+
+def write_tables(f: TextIO, tables: Iterable[dict]) -> None:
+    '''Writing tables to the file row by row, rows may be any iterables'''
+    f.write('[')
+    for i, table in enumerate(tables):
+        if i:
+            f.write(', ')
+        f.write(f'{{"name": {dumps(table["name"])}, "table": [')
+        for j, row in enumerate(table["table"]):
+            if j:
+                f.write(', ')
+            f.write(dumps(list(row)))
+        f.write(f'], "dw_rows": {dumps(list(table["dw_rows"]))}}}')
+    f.write(']')
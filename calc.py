@@ -0,0 +1,786 @@
+# This Python file uses the following encoding: utf-8
+'''Calculation of table areas and volumes without the GUI
+
+Counts tables the same way the application does,
+so .cajs files can be processed on machines without a display.
+
+Engine of new sheets is chosen by environment variable before starting:
+    CALCAREA_ENGINE=decimal     every value is a Decimal (default)
+    CALCAREA_ENGINE=fixed       values are integers of hundredths, tenths etc. (FixedSheet),
+                                results are the same, totals are counted several times faster
+    CALCAREA_ENGINE=vector      same as fixed, whole tables are recalculated with NumPy arrays if it is installed
+'''
+import os
+import re
+from collections import Counter, deque
+from concurrent.futures import Executor, Future
+from decimal import Decimal as Dec
+
+from typing import Any, Callable, Iterable, Iterator, SupportsIndex
+
+import autosave
+import cabin
+import cajs
+from diagnostics import timed
+
+
+class Column:
+    '''Value type, rounding and default value of a table column'''
+    def __init__(self, value_type: type, default: str | Dec = None, rounding: SupportsIndex = None, editable: bool = True) -> None:
+        self.value_type = value_type
+        self.rounding = rounding
+        self.editable = editable
+
+        if not default:
+            default = value_type()
+        self.default = default
+
+    @property
+    def rounded(self) -> bool:
+        '''Whether values of the column are rounded'''
+        return self.value_type in (int, float, Dec) and self.rounding is not None
+
+    def display(self, value: str | Dec) -> str:
+        '''Text of the cell with given value (already read)'''
+        if not value and self.rounded:  # Default value is displayed rounded, e.g. "0.00"
+            return str(self.round(self.default, self.rounding))
+        return str(value)
+
+    def read(self, value: str | Dec) -> str | Dec:
+        '''Value of the cell as it is displayed (rounded), default if empty'''
+        if self.rounded:
+            value = self.round(value, self.rounding)
+        if not value:
+            return self.default
+        return value
+
+    @staticmethod
+    def round(num: Dec, rounding: SupportsIndex) -> Dec:
+        '''Rounding to the given number of decimal places'''
+        num *= Dec('1.000000001')   # 0.5 rounding to 1
+        return round(num, rounding)
+
+    def verify_value(self, value: Any) -> Any:
+        '''Converting value to the column type, default if not possible'''
+        if not value:
+            value = self.default
+        elif type(value) is Dec and self.value_type is Dec:  # Already parsed
+            pass
+        else:
+            value = str(value).replace(',', '.')
+            value = str(value).replace('ё', "'")
+            try:
+                value = self.value_type(value)
+            except:
+                value = self.default
+        return value
+
+
+class Sheet:
+    '''Columnar store of table values with area calculations'''
+    def __init__(self, name: str = 'MAIN', letter_default: str = 'A') -> None:
+        self.name = name
+        self.columns = (Column(str, letter_default),    # "Letter"
+                        Column(Dec, rounding=2),        # "Width" with rounding to hundredths
+                        Column(Dec, rounding=2),        # "Length"
+                        Column(Dec, rounding=2),        # "Height"
+                        Column(Dec, rounding=1, editable=False),    # "Area" with rounding to tenths
+                        Column(Dec, rounding=0, editable=False),    # "Volume" with rounding to whole numbers
+                        )
+        self.values: tuple[list] = tuple([] for _ in self.columns)  # Values by columns, parsed and rounded once when set
+        self.exact: dict[int, list[Dec]] = {4: [], 5: []}   # Not rounded "Area" and "Volume" summed in composite area
+
+        self.dwelling: list[bool] = list()  # Whether each row is marked as "Dwelling area"
+        self.lead: list[int] = list()       # Distance from each row to the top row of its composite area group
+        self.summed: list[Dec] = list()     # Area each row adds to the sums
+        self.area_sum: Dec = Dec('0')       # Total area
+        self.area_dw: Dec = Dec('0')        # Dwelling area
+        # Rows adding nonzero area to total and dwelling area, without them the sum is displayed as "0"
+        # (not "0.0" left by areas summed and subtracted again), as counting the whole table displays it
+        self.nonzero: list[int] = [0, 0]
+
+        self.changed: Callable[[int, int], None] = None     # Called with coordinates of cells which displayed value is changed
+
+    @property
+    def rows(self) -> int:
+        '''Amount of table rows getter'''
+        return len(self.lead)
+
+    @property
+    def cols(self) -> int:
+        '''Amount of table columns getter'''
+        return len(self.columns)
+
+    @property
+    def sums(self) -> tuple[Dec, Dec]:
+        '''Total and dwelling area'''
+        return (self.area_sum if self.nonzero[0] else Dec('0'),
+                self.area_dw if self.nonzero[1] else Dec('0'))
+
+    @property
+    def dw_rows(self) -> list[int]:
+        '''Indices of rows marked as "Dwelling area"'''
+        return [row for row, dwelling in enumerate(self.dwelling) if dwelling]
+    @dw_rows.setter
+    def dw_rows(self, rows: Iterable[int]) -> None:
+        '''Marking only given rows as "Dwelling area" (sums are counted on the next update)'''
+        self.dwelling = [False]*self.rows
+        for row in rows:
+            if 0 <= row < self.rows:
+                self.dwelling[row] = True
+
+    def value(self, row: int, col: int) -> str | Dec:
+        '''Value of the cell as it is displayed'''
+        return self.values[col][row]
+
+    def raw(self, row: int, col: int) -> str | Dec:
+        '''Value of the cell before rounding'''
+        if col in self.exact:
+            return self.exact[col][row]
+        return self.values[col][row]
+
+    def set_value(self, row: int, col: int, value: Any) -> None:
+        '''Parsing, rounding and storing value of the cell'''
+        column = self.columns[col]
+        value = column.verify_value(value)
+        if col in self.exact:
+            self.exact[col][row] = value
+        value = column.read(value)
+
+        old = self.values[col][row]
+        if old == value and str(old) == str(value):  # Not reporting the cell if its text is the same
+            return
+        self.values[col][row] = value
+        if self.changed:
+            self.changed(row, col)
+
+    def insert_rows(self, row: int, count: int) -> None:
+        '''Inserting rows filled with default values'''
+        for values, column in zip(self.values, self.columns):
+            values[row:row] = [column.default]*count
+        for col, values in self.exact.items():
+            values[row:row] = [self.columns[col].default]*count
+        self.lead[row:row] = [0]*count
+        self.summed[row:row] = [Dec('0')]*count
+        self.dwelling[row:row] = [False]*count
+
+    def remove_rows(self, row: int, count: int) -> None:
+        '''Removing rows with their values and areas'''
+        for r in range(row, row+count):
+            self.subtract_row(r)
+        for values in (*self.values, *self.exact.values(), self.lead, self.summed, self.dwelling):
+            del values[row:row+count]
+
+    def resize(self, num: int) -> None:
+        '''Setting amount of rows in the table'''
+        if num > self.rows:
+            self.insert_rows(self.rows, num - self.rows)
+        else:
+            self.remove_rows(num, self.rows - num)
+
+    def set_dwelling(self, row: int, dwelling: bool) -> None:
+        '''Marking or unmarking row as "dwelling"'''
+        if self.dwelling[row] == dwelling:
+            return
+        self.dwelling[row] = dwelling
+        if dwelling:
+            self.area_dw += self.summed[row]
+        else:
+            self.area_dw -= self.summed[row]
+        if self.summed[row]:
+            self.nonzero[1] += 1 if dwelling else -1
+
+    def update(self) -> range:
+        '''Recalculating the whole table, returns recalculated rows'''
+        self.lead = [0]*self.rows
+        self.summed = [Dec('0')]*self.rows
+        self.area_sum = self.area_dw = Dec('0')
+        self.nonzero = [0, 0]
+        return self.recalculate(0, self.rows-1)
+
+    @timed('recalculate')
+    def recalculate(self, first: int, last: int) -> range:
+        '''Recalculating rows from first to last together with composite area groups they belong to,
+        returns recalculated rows'''
+        first, last = max(first, 0), min(last, self.rows-1)
+        if first > last:    # Nothing left to recalculate (e.g. all rows are removed)
+            return range(0)
+
+        if first == 0 and self.value(0, 0).startswith(('+', '-')):
+            self.set_value(0, 0, self.value(0, 0).lstrip('+-'))    # Deleting '+' and '-' from "Letter" value if it has no rows above
+
+        # Extending range to the top row of the group and to the last row added to it
+        last = self.index_composite(first, last)
+        first -= self.lead[first]
+
+        self.count_area(first, last)
+        self.count_volume(first, last)
+        self.composite_area(first, last)
+        self.sum_area(first, last)
+        return range(first, last+1)
+
+    def index_composite(self, first: int, last: int) -> int:
+        '''Updating composite area groups of rows from first to last,
+        returns the last row of the group that contains the last given row'''
+        for row in range(first, self.rows):
+            if row and self.value(row, 0).startswith(('+', '-')):  # Row is added to the group above
+                self.lead[row] = self.lead[row-1] + 1
+            elif row > last:
+                return row-1
+            else:
+                self.lead[row] = 0
+        return self.rows-1
+
+    @timed('count_area')
+    def count_area(self, first: int, last: int) -> None:
+        '''Updates values in "Area" column'''
+
+        for row in range(first, last+1):
+            self.set_value(row, 4, self.value(row, 1) * self.value(row, 2))
+            if self.value(row, 0).startswith('-'):    # Inverting area value if "Letter" column in row starts with '-'
+                self.set_value(row, 4, self.value(row, 4) * -1)
+
+    @timed('count_volume')
+    def count_volume(self, first: int, last: int) -> None:
+        '''Updates values in "Volume" column'''
+
+        for row in range(first, last+1):
+            self.set_value(row, 5, self.value(row, 3) * self.value(row, 4))
+
+    @timed('composite_area')
+    def composite_area(self, first: int, last: int) -> None:
+        '''If row has first character '+' in "Letter" column it will add it's area value to previous row value'''
+
+        # Starting iteration of table rows in reverse,
+        # so it can sum area values by chain to the top row, that has no '+'
+        for row in range(last, first, -1):
+            if self.lead[row]:
+                for col in (4, 5):
+                    self.set_value(row-1, col, self.raw(row-1, col) + self.raw(row, col))
+
+    @timed('sum_area')
+    def sum_area(self, first: int, last: int) -> None:
+        '''Updates area sums by changes of the rows'''
+
+        dwelling = self.dwelling
+        for row in range(first, last+1):
+            if self.lead[row]:  # If "Letter" starts with '+' or '-' not adding to the sum
+                area = Dec('0')
+            else:
+                area = self.value(row, 4)
+
+            delta = area - self.summed[row]
+            step = bool(area) - bool(self.summed[row])
+            self.summed[row] = area
+            self.area_sum += delta
+            self.nonzero[0] += step
+            if dwelling[row]:
+                self.area_dw += delta
+                self.nonzero[1] += step
+
+    def subtract_row(self, row: int) -> None:
+        '''Removing area of the row from the sums before deleting it'''
+        self.area_sum -= self.summed[row]
+        if self.dwelling[row]:
+            self.area_dw -= self.summed[row]
+        if self.summed[row]:
+            self.nonzero[0] -= 1
+            self.nonzero[1] -= self.dwelling[row]
+
+    def ingest(self, matrix: Iterable[Iterable], dw_rows: Iterable[int] = ()) -> range:
+        '''Replacing the whole table with the matrix in one pass and recalculating it once,
+        returns recalculated rows'''
+        width = len(matrix[0]) if matrix else 0
+        values = []
+        for col, column in enumerate(self.columns):
+            if col < width:
+                verify_value, read = column.verify_value, column.read
+                values.append([read(verify_value(row[col])) for row in matrix])
+            else:
+                values.append([column.default]*len(matrix))
+        self.values = tuple(values)
+        self.exact = {col: [self.columns[col].default]*len(matrix) for col in self.exact}
+        self.lead = [0]*len(matrix)
+        self.summed = [Dec('0')]*len(matrix)
+        self.dw_rows = dw_rows
+
+        # Cells are not reported one by one, the whole table is changed
+        changed, self.changed = self.changed, None
+        try:
+            return self.update()
+        finally:
+            self.changed = changed
+
+    @timed('load')
+    def load_json(self, matrix: Iterable[Iterable]) -> range:    # For legacy .json support
+        '''Loading table from matrix (.json file type)'''
+        return self.ingest(matrix)
+
+    @timed('load')
+    def load(self, table: dict) -> range:
+        '''Loading table from dictionary'''
+        return self.ingest(table["table"], table["dw_rows"])
+
+    def _matrix(self, columns: Iterable[list]) -> Iterator[tuple]:
+        '''Rows of texts of given "Letter", "Width", "Length" and "Height" values'''
+        return zip(*(map(str, values) for values in columns))
+
+    def iter_matrix(self) -> Iterator[tuple]:
+        '''Rows of table items as they are saved, produced one by one'''
+        return self._matrix(self.values[:-2])
+
+    def get_matrix(self) -> tuple[tuple]:
+        '''Get matrix of table items'''
+        return tuple(self.iter_matrix())
+
+    def texts(self, rows: range, cols: Iterable[int]) -> Iterator[tuple[str]]:
+        '''Texts of the cells in given rows and columns as they are displayed, row by row'''
+        return zip(*(map(self.columns[col].display, self._slice(col, rows)) for col in cols))
+
+    def _slice(self, col: int, rows: range) -> list[str | Dec]:
+        '''Values of the column in given rows as value returns them'''
+        return self.values[col][rows.start:rows.stop]
+
+    def save(self) -> dict:
+        '''Get dictionary of the table as it is saved in .cajs file, rows are produced while writing'''
+        return {"name": self.name, "table": self.iter_matrix(), "dw_rows": tuple(self.dw_rows), "sums": self.sums}
+
+    def snapshot(self) -> dict:
+        '''Same as save, but with copied values, so it can be written from another thread while the table is edited'''
+        columns = [list(values) for values in self.values[:-2]]
+        return {"name": self.name, "table": self._matrix(columns), "dw_rows": tuple(self.dw_rows), "sums": self.sums}
+
+
+NUDGE = 1_000_000_001   # Dec('1.000000001') of Column.round scaled by 10**9
+SMALL = 500_000_000     # Below it the nudge only rounds halves away from zero
+PRECISION = 10**28      # Decimal context keeps 28 significant digits
+UNITS = tuple(10**drop for drop in range(4))
+PLAIN = re.compile(r'(-?)([0-9]+)(?:\.([0-9]*))?')    # Number without exponent
+
+
+def round_fixed(num: int, drop: int) -> int:
+    '''Integer of 10**-k units rounded to k-drop decimal places exactly as Column.round rounds Decimal'''
+    if -SMALL < num < SMALL:
+        if not drop:
+            return num
+        quotient, remainder = divmod(num, UNITS[drop])
+        half = UNITS[drop] // 2
+        if remainder > half or (remainder == half and num > 0):
+            quotient += 1
+        return quotient
+
+    nudged = num * NUDGE
+    if -PRECISION < nudged < PRECISION:
+        divisor = UNITS[drop] * 10**9
+        quotient, remainder = divmod(nudged, divisor)
+        # Half to even, as round() of Decimal
+        if 2*remainder > divisor or (2*remainder == divisor and quotient & 1):
+            quotient += 1
+        return quotient
+    # Nudged value does not fit the Decimal context, so it is rounded by the context first
+    return int(Column.round(Dec(num), -drop).scaleb(-drop))
+
+
+class FixedSheet(Sheet):
+    '''Sheet keeping numbers as integers of their smallest displayed units:
+    hundredths of "Width", "Length" and "Height", tenths of "Area" and whole "Volume".
+
+    Rounding follows Column.round exactly, so values and sums are the same as Sheet counts them
+    while areas stay below 10**20 (beyond that Decimal loses digits of products).
+    Not finite numbers ("NaN", "Infinity") are read as zero.
+    '''
+    PLACES = (None, 2, 2, 2, 1, 0)      # Decimal places of values by columns
+    EXACT = {4: 4, 5: 3}                # Decimal places of not rounded "Area" (width * length) and "Volume" (height * area)
+
+    def __init__(self, name: str = 'MAIN', letter_default: str = 'A') -> None:
+        super().__init__(name, letter_default)
+        self.area_sum: int = 0      # Tenths of total area
+        self.area_dw: int = 0       # Tenths of dwelling area
+
+    @staticmethod
+    def decimal(num: int, places: int) -> Dec:
+        '''Decimal of the integer as Sheet keeps it'''
+        if not num:
+            return Dec('0')
+        return Dec(num).scaleb(-places)
+
+    def parse(self, value: Any, col: int) -> int:
+        '''Value of the cell as integer of its smallest displayed units'''
+        places = self.PLACES[col]
+        if isinstance(value, str):
+            match = PLAIN.fullmatch(value.replace(',', '.'))
+            if match and len(match[3] or '') <= places:   # Nothing to round but the nudge of big numbers
+                num = int(match[2] + (match[3] or '').ljust(places, '0'))
+                return round_fixed(-num if match[1] else num, 0)
+
+        column = self.columns[col]
+        value = column.verify_value(value)
+        if not value.is_finite():
+            return 0
+        num = value.scaleb(places)
+        if num == num.to_integral_value():  # E.g. read from .cabin file
+            return round_fixed(int(num), 0)
+        return int(column.read(value).scaleb(places))
+
+    @property
+    def sums(self) -> tuple[Dec, Dec]:
+        '''Total and dwelling area'''
+        return (Dec(self.area_sum).scaleb(-1) if self.nonzero[0] else Dec('0'),
+                Dec(self.area_dw).scaleb(-1) if self.nonzero[1] else Dec('0'))
+
+    def value(self, row: int, col: int) -> str | Dec:
+        '''Value of the cell as it is displayed'''
+        if col:
+            return self.decimal(self.values[col][row], self.PLACES[col])
+        return self.values[0][row]
+
+    def raw(self, row: int, col: int) -> str | Dec:
+        '''Value of the cell before rounding'''
+        if col in self.exact:
+            return self.decimal(self.exact[col][row], self.EXACT[col])
+        return self.value(row, col)
+
+    def store(self, row: int, col: int, num: int) -> None:
+        '''Storing integer value of the cell'''
+        if self.values[col][row] != num:
+            self.values[col][row] = num
+            if self.changed:
+                self.changed(row, col)
+
+    def set_value(self, row: int, col: int, value: Any) -> None:
+        '''Parsing, rounding and storing value of the cell'''
+        if not col:
+            super().set_value(row, col, value)
+            return
+        num = self.parse(value, col)
+        if col in self.exact:
+            self.exact[col][row] = num * 10**(self.EXACT[col] - self.PLACES[col])
+        self.store(row, col, num)
+
+    def insert_rows(self, row: int, count: int) -> None:
+        '''Inserting rows filled with default values'''
+        self.values[0][row:row] = [self.columns[0].default]*count
+        for values in (*self.values[1:], *self.exact.values(), self.lead, self.summed):
+            values[row:row] = [0]*count
+        self.dwelling[row:row] = [False]*count
+
+    def set_dwelling(self, row: int, dwelling: bool) -> None:
+        '''Marking or unmarking row as "dwelling"'''
+        if self.dwelling[row] != dwelling:
+            super().set_dwelling(row, dwelling)
+
+    def update(self) -> range:
+        '''Recalculating the whole table, returns recalculated rows'''
+        self.lead = [0]*self.rows
+        self.summed = [0]*self.rows
+        self.area_sum = self.area_dw = 0
+        self.nonzero = [0, 0]
+        return self.recalculate(0, self.rows-1)
+
+    @timed('count_area')
+    def count_area(self, first: int, last: int) -> None:
+        '''Updates values in "Area" column'''
+        letters, widths, lengths = self.values[:3]
+        exact = self.exact[4]
+        for row in range(first, last+1):
+            area = widths[row] * lengths[row]
+            num = round_fixed(area, 3)
+            if letters[row].startswith('-'):  # Rounded area is inverted as in Sheet
+                area = -num * 1000
+                num = round_fixed(-num, 0)
+            exact[row] = area
+            self.store(row, 4, num)
+
+    @timed('count_volume')
+    def count_volume(self, first: int, last: int) -> None:
+        '''Updates values in "Volume" column'''
+        heights, areas = self.values[3], self.values[4]
+        exact = self.exact[5]
+        for row in range(first, last+1):
+            exact[row] = volume = heights[row] * areas[row]
+            self.store(row, 5, round_fixed(volume, 3))
+
+    @timed('composite_area')
+    def composite_area(self, first: int, last: int) -> None:
+        '''If row has first character '+' in "Letter" column it will add it's area value to previous row value'''
+        lead = self.lead
+        for col, exact in self.exact.items():
+            for row in range(last, first, -1):
+                if lead[row]:
+                    exact[row-1] += exact[row]
+                    self.store(row-1, col, round_fixed(exact[row-1], 3))
+
+    @timed('sum_area')
+    def sum_area(self, first: int, last: int) -> None:
+        '''Updates area sums by changes of the rows'''
+        lead, areas, summed, dwelling = self.lead, self.values[4], self.summed, self.dwelling
+        for row in range(first, last+1):
+            area = 0 if lead[row] else areas[row]
+            if area or summed[row]:
+                delta = area - summed[row]
+                step = bool(area) - bool(summed[row])
+                summed[row] = area
+                self.area_sum += delta
+                self.nonzero[0] += step
+                if dwelling[row]:
+                    self.area_dw += delta
+                    self.nonzero[1] += step
+
+    def subtract_row(self, row: int) -> None:
+        '''Removing area of the row from the sums before deleting it'''
+        if self.summed[row]:
+            self.area_sum -= self.summed[row]
+            self.nonzero[0] -= 1
+            if self.dwelling[row]:
+                self.area_dw -= self.summed[row]
+                self.nonzero[1] -= 1
+
+    def ingest(self, matrix: Iterable[Iterable], dw_rows: Iterable[int] = ()) -> range:
+        '''Replacing the whole table with the matrix in one pass and recalculating it once,
+        returns recalculated rows'''
+        width = len(matrix[0]) if matrix else 0
+        column = self.columns[0]
+        values = [[column.read(column.verify_value(row[0])) for row in matrix] if width else [column.default]*len(matrix)]
+        for col in range(1, self.cols):
+            if col < width:
+                parse = self.parse
+                values.append([parse(row[col], col) for row in matrix])
+            else:
+                values.append([0]*len(matrix))
+        self.values = tuple(values)
+        self.exact = {col: [0]*len(matrix) for col in self.exact}
+        self.lead = [0]*len(matrix)
+        self.summed = [0]*len(matrix)
+        self.dw_rows = dw_rows
+
+        changed, self.changed = self.changed, None
+        try:
+            return self.update()
+        finally:
+            self.changed = changed
+
+    def _matrix(self, columns: Iterable[list]) -> Iterator[tuple]:
+        '''Rows of texts of given "Letter", "Width", "Length" and "Height" values'''
+        letters, *numbers = columns
+        decimal = self.decimal
+        return zip(letters, *(map(str, (decimal(num, 2) for num in values)) for values in numbers))
+
+    def _slice(self, col: int, rows: range) -> list[str | Dec]:
+        '''Values of the column in given rows as value returns them'''
+        values = self.values[col][rows.start:rows.stop]
+        if not col:
+            return values
+        decimal, places = self.decimal, self.PLACES[col]
+        return [decimal(num, places) for num in values]
+
+
+numpy = None    # Imported when VectorSheet first counts a table, so other engines start without it (False if not installed)
+
+
+def import_numpy() -> bool:
+    '''Importing NumPy for VectorSheet, False if it is not installed'''
+    global numpy
+    if numpy is None:
+        try:
+            import numpy
+        except ImportError:     # Vector engine counts without NumPy as FixedSheet does
+            numpy = False
+    return bool(numpy)
+
+
+class VectorSheet(FixedSheet):
+    '''FixedSheet recalculating the whole table at once with NumPy arrays (on loading and full updates),
+    edits of single rows are counted as in FixedSheet'''
+    LIMIT = 2**31   # Widths, lengths and heights of arrays, so their products fit int64
+
+    @staticmethod
+    def rounded(exact: numpy.ndarray) -> numpy.ndarray:
+        '''Thousandths rounded to whole units as round_fixed(num, 3) rounds numbers below SMALL'''
+        quotient, remainder = numpy.divmod(exact, 1000)
+        return quotient + ((remainder > 500) | ((remainder == 500) & (exact > 0)))
+
+    def update(self) -> range:
+        '''Recalculating the whole table, returns recalculated rows'''
+        rows = self.rows
+        if not rows or not import_numpy():
+            return super().update()
+        if self.value(0, 0).startswith(('+', '-')):
+            self.set_value(0, 0, self.value(0, 0).lstrip('+-'))
+        if not self.count_arrays():     # Too big numbers are counted by Python integers
+            return super().update()
+        return range(rows)
+
+    @timed('count_arrays')
+    def count_arrays(self) -> bool:
+        '''Counting areas, volumes, composite groups and sums of all rows,
+        False if numbers are too big to be counted in int64 arrays'''
+        rows = self.rows
+        letters, *numbers = self.values[:4]
+        try:
+            width, length, height = (numpy.array(values, dtype=numpy.int64) for values in numbers)
+        except OverflowError:
+            return False
+        if max(abs(array).max() for array in (width, length, height)) >= self.LIMIT:
+            return False
+
+        first = numpy.array([letter[:1] for letter in letters], dtype='U1')
+        negative = first == '-'
+        added = negative | (first == '+')
+        added[0] = False
+
+        area = width * length
+        if abs(area).max() >= SMALL:
+            return False
+        num = self.rounded(area)
+        area = numpy.where(negative, -num * 1000, area)     # Rounded area is inverted as in Sheet
+        num = numpy.where(negative, -num, num)
+        volume = height * num
+
+        # Each row of composite area group adds its area and the areas of rows below it in the group
+        index = numpy.arange(rows)
+        lead = index - numpy.maximum.accumulate(numpy.where(added, 0, index))
+        tops = numpy.flatnonzero(~added)
+        last = numpy.append(tops[1:], rows)[numpy.cumsum(~added) - 1] - 1   # Last row of the group of every row
+        exact = dict()
+        for col, values in ((4, area), (5, volume)):
+            total = numpy.cumsum(values)
+            exact[col] = total[last] - total + values
+            if abs(exact[col]).max() >= SMALL:
+                return False
+
+        changes = []
+        for col in (4, 5):
+            new = self.rounded(exact[col])
+            changes += [(row, col) for row in numpy.flatnonzero(numpy.array(self.values[col]) != new).tolist()]
+            self.values[col][:] = new.tolist()
+            self.exact[col] = exact[col].tolist()
+        summed = numpy.where(lead > 0, 0, self.values[4])
+        dwelling = numpy.array(self.dwelling, dtype=bool)
+
+        self.lead = lead.tolist()
+        self.summed = summed.tolist()
+        self.area_sum = int(summed.sum())
+        self.area_dw = int(summed[dwelling].sum())
+        self.nonzero = [int(numpy.count_nonzero(summed)), int(numpy.count_nonzero(summed[dwelling]))]
+
+        if self.changed:
+            for row, col in changes:
+                self.changed(row, col)
+        return True
+
+
+ENGINES: dict[str, type[Sheet]] = {'decimal': Sheet, 'fixed': FixedSheet, 'vector': VectorSheet}
+engine: str = os.environ.get('CALCAREA_ENGINE', 'decimal')     # Engine of new sheets
+
+
+def new_sheet(name: str = 'MAIN', letter_default: str = 'A') -> Sheet:
+    '''Empty sheet counted by the chosen engine'''
+    return ENGINES[engine](name, letter_default)
+
+
+def count_table(table: dict, letter_default: str = 'A', engine_name: str = None) -> Sheet:
+    '''Sheet counted from table in the form of .cajs (only "table" matrix of legacy .json files is needed),
+    module-level so it can be called in another process'''
+    sheet = ENGINES[engine_name or engine](table.get("name"), letter_default)
+    if "dw_rows" in table:
+        sheet.load(table)
+    else:
+        sheet.load_json(table["table"])
+    return sheet
+
+
+def count_tables(tables: Iterable[dict], executor: Executor = None) -> Iterator[Sheet]:
+    '''Counted sheets of tables in their order, the first one is the main table.
+    Given executor (e.g. ProcessPoolExecutor) counts tables in parallel with the same results,
+    only a few tables per worker are read ahead of the one yielded'''
+    if executor is None:
+        for i, table in enumerate(tables):
+            yield count_table(table, '0' if i else 'A')
+        return
+
+    ahead = 2 * (os.cpu_count() or 1)
+    futures: deque[Future] = deque()
+    try:
+        for i, table in enumerate(tables):
+            futures.append(executor.submit(count_table, table, '0' if i else 'A', engine))
+            if len(futures) > ahead:
+                yield futures.popleft().result()
+        while futures:
+            yield futures.popleft().result()
+    finally:    # Tables are not needed anymore if the caller stops
+        for future in futures:
+            future.cancel()
+
+
+def load_project(path: str, executor: Executor = None) -> list[Sheet]:
+    '''Loading and counting all tables of .cajs or .cabin file, the first one is the main table,
+    in parallel if executor is given (see count_tables)'''
+    if path.endswith('.cabin'):
+        f = open(path, 'rb')
+        tables = cabin.iter_tables(f)
+    else:
+        f = open(path, 'rt', encoding='utf-8')
+        tables = cajs.iter_tables(f)
+    with f:
+        return list(count_tables(tables, executor))     # Only a few tables are parsed at a time
+
+
+def save_project(path: str, sheets: Iterable[Sheet]) -> None:
+    '''Saving tables to .cajs or .cabin file'''
+    autosave.write_project(path, (sheet.save() for sheet in sheets))
+
+
+class Building:
+    '''Area sums of all floors, updated by the difference when a floor changes
+    instead of summing every floor again'''
+    def __init__(self) -> None:
+        self.floors: dict[Any, tuple[Dec, Dec]] = dict()    # Last total and dwelling area of every floor
+        self.total = Dec('0')
+        self.dwelling = Dec('0')
+        # Exponents of the floor sums, totals are shown with as many decimal places as summing them one by one gives
+        self.exponents = (Counter(), Counter())
+
+    def __len__(self) -> int:
+        return len(self.floors)
+
+    def set(self, floor: Any, sums: tuple[Dec, Dec]) -> None:
+        '''Setting total and dwelling area of the floor (any hashable key), adding it if it is new'''
+        self.remove(floor)
+        area_total, area_dw = sums
+        self.floors[floor] = area_total, area_dw
+        self.total += area_total
+        self.dwelling += area_dw
+        for exponents, area in zip(self.exponents, (area_total, area_dw)):
+            exponents[area.as_tuple().exponent] += 1
+
+    def remove(self, floor: Any) -> None:
+        '''Removing area of the floor from the sums, if it was added'''
+        sums = self.floors.pop(floor, None)
+        if sums is None:
+            return
+        area_total, area_dw = sums
+        self.total -= area_total
+        self.dwelling -= area_dw
+        for exponents, area in zip(self.exponents, sums):
+            exponent = area.as_tuple().exponent
+            exponents[exponent] -= 1
+            if not exponents[exponent]:
+                del exponents[exponent]
+
+    def clear(self) -> None:
+        self.__init__()
+
+    @property
+    def sums(self) -> tuple[Dec, Dec, Dec]:
+        '''Total, dwelling and economical area of all floors'''
+        area_total, area_dw = (area.quantize(Dec(1).scaleb(min((0, *exponents))))
+                               for area, exponents in zip((self.total, self.dwelling), self.exponents))
+        return area_total, area_dw, area_total - area_dw
+
+
+def sum_floors(sheets: Iterable[Sheet]) -> tuple[Dec, Dec, Dec]:
+    '''Total, dwelling and economical area of all given tables'''
+    building = Building()
+    for sheet in sheets:
+        building.set(sheet, sheet.sums)
+    return building.sums
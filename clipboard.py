@@ -0,0 +1,35 @@
+# This Python file uses the following encoding: utf-8
+'''Ranges of cells copied to and pasted from the clipboard
+
+Spreadsheets copy cells as tab separated values, one line per row.
+Text without tabs is read as CSV separated by semicolons, as spreadsheets save it
+with decimal commas, or by commas if a line has more than one of them,
+otherwise every line is a single cell, so "1,55" stays a number with a decimal comma.
+'''
+import csv
+
+from typing import Iterable
+
+
+def read_range(text: str) -> list[list[str]]:
+    '''Rows of cells of the copied text, empty if there is nothing to paste'''
+    lines = text.splitlines()
+    while lines and not lines[-1].strip():  # Spreadsheets end the last row with a line break
+        lines.pop()
+    if not lines:
+        return []
+
+    if any('\t' in line for line in lines):
+        delimiter = '\t'
+    elif any(';' in line for line in lines):
+        delimiter = ';'
+    elif any(line.count(',') > 1 for line in lines):
+        delimiter = ','
+    else:
+        return [[line.strip()] for line in lines]
+    return [[cell.strip() for cell in row] for row in csv.reader(lines, delimiter=delimiter)]
+
+
+def write_range(rows: Iterable[Iterable[str]]) -> str:
+    '''Text of the cells to copy, tab separated as spreadsheets paste it'''
+    return '\n'.join('\t'.join(row) for row in rows)
@@ -0,0 +1,120 @@
+# This Python file uses the following encoding: utf-8
+'''Timers and counters of table hot paths
+
+Disabled by default, the timed functions are then left as they are, so they cost nothing.
+Enable by environment variables before starting the application:
+    CALCAREA_DIAGNOSTICS=1          timers, counters and diagnostics panel (F12)
+    CALCAREA_LOG=calcarea.log       also write every timed call to the log file
+    CALCAREA_PROFILE=calcarea.prof  profile the whole session with cProfile
+'''
+import atexit
+import logging
+import os
+from collections import deque
+from cProfile import Profile
+from functools import wraps
+from time import perf_counter
+
+from typing import Callable
+
+
+enabled: bool = bool(os.environ.get('CALCAREA_DIAGNOSTICS') or os.environ.get('CALCAREA_LOG'))
+
+log = logging.getLogger('calcarea')
+
+
+class Counter:
+    '''Calls and time spent in one operation'''
+    __slots__ = ('calls', 'total', 'last', 'max')
+
+    def __init__(self) -> None:
+        self.calls: int = 0
+        self.total: float = 0.0    # Seconds
+        self.last: float = 0.0
+        self.max: float = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.calls += 1
+        self.total += seconds
+        self.last = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+
+counters: dict[str, Counter] = dict()   # Counters by operation names
+recent: deque[tuple[str, float, int]] = deque(maxlen=50)    # Last calls: operation, seconds, recalculated rows
+profiler: Profile = None    # Running cProfile capture
+
+
+def record(name: str, seconds: float, rows: int = None) -> None:
+    '''Adding call of the operation to counters'''
+    counter = counters.get(name)
+    if counter is None:
+        counter = counters[name] = Counter()
+    counter.add(seconds)
+    recent.append((name, seconds, rows))
+    log.debug('%s %.3f ms%s', name, seconds*1000, '' if rows is None else f' {rows} rows')
+
+
+def timed(name: str) -> Callable:
+    '''Decorator counting calls and time of the function,
+    amount of recalculated rows is taken from the result if it is a range'''
+    def decorator(func: Callable) -> Callable:
+        if not enabled:
+            return func
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            result = func(*args, **kwargs)
+            record(name, perf_counter() - start, len(result) if isinstance(result, range) else None)
+            return result
+        return wrapper
+    return decorator
+
+
+def reset() -> None:
+    '''Clearing all counters'''
+    counters.clear()
+    recent.clear()
+
+
+def report() -> str:
+    '''Text table of counters and recent calls'''
+    lines = [f"{'operation':<16}{'calls':>8}{'total ms':>12}{'avg ms':>10}{'last ms':>10}{'max ms':>10}"]
+    for name, c in sorted(counters.items()):
+        lines.append(f"{name:<16}{c.calls:>8}{c.total*1000:>12.1f}{c.total/c.calls*1000:>10.2f}{c.last*1000:>10.2f}{c.max*1000:>10.2f}")
+    lines.append('')
+    lines.append('recent:')
+    for name, seconds, rows in reversed(recent):
+        lines.append(f"{name:<16}{seconds*1000:>10.2f} ms" + ('' if rows is None else f"{rows:>8} rows"))
+    return '\n'.join(lines)
+
+
+def start_profile() -> None:
+    '''Starting cProfile capture'''
+    global profiler
+    if profiler is None:
+        profiler = Profile()
+        profiler.enable()
+
+
+def stop_profile(path: str = None) -> None:
+    '''Stopping cProfile capture and writing its stats to the file (readable with pstats or snakeviz)'''
+    global profiler
+    if profiler is not None:
+        profiler.disable()
+        if path:
+            profiler.dump_stats(path)
+        profiler = None
+
+
+if os.environ.get('CALCAREA_LOG'):
+    handler = logging.FileHandler(os.environ['CALCAREA_LOG'], encoding='utf-8')
+    handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+    log.addHandler(handler)
+    log.setLevel(logging.DEBUG)
+
+if os.environ.get('CALCAREA_PROFILE'):
+    start_profile()
+    atexit.register(stop_profile, os.environ['CALCAREA_PROFILE'])
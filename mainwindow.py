@@ -1,27 +1,45 @@
 # This Python file uses the following encoding: utf-8
+import os
 import sys
-from traceback import format_exception_only, format_exception
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import get_context
 from decimal import Decimal as Dec
-from json import dump, load
+from json import load
 from os.path import exists
+from threading import Event
 
-from typing import Any, Iterator, Iterable, SupportsIndex
+from typing import Any, Callable, Iterator, Iterable
 from types import FunctionType
+from contextlib import contextmanager, nullcontext
 
-from keyboard import add_hotkey
-from pyperclip import copy
+# keyboard, pyperclip and traceback are imported when first needed, so the window is shown sooner
 # from openpyxl import Workbook # not used
 
-from PySide6.QtWidgets import QApplication, QMainWindow, QTableWidget, QTableWidgetItem, QFileDialog, QMessageBox, QWidget, QTextBrowser, QPushButton, QLabel, QCheckBox, QHBoxLayout, QSizePolicy, QLineEdit
-from PySide6.QtGui import QIcon, QColor, QBrush, QCloseEvent, QFont
-from PySide6.QtCore import Qt, Signal, Slot, QObject, QRect, QCoreApplication, QSize
+from PySide6.QtWidgets import QApplication, QMainWindow, QTableView, QFileDialog, QMessageBox, QWidget, QTextBrowser, QPushButton, QLabel, QCheckBox, QHBoxLayout, QVBoxLayout, QSizePolicy, QLineEdit, QProgressDialog
+from PySide6.QtGui import QIcon, QColor, QCloseEvent, QFont, QFontDatabase, QShortcut, QKeySequence, QUndoStack, QUndoCommand
+from PySide6.QtCore import Qt, Signal, Slot, QObject, QRect, QCoreApplication, QSize, QAbstractTableModel, QModelIndex, QTimer, QStandardPaths, QEventLoop
 
 # Important:
 # You need to run the following command to generate the ui_form.py file
 #     pyside6-uic form.ui -o ui_form.py
 from ui_form import Ui_MainWindow
+from calc import Building, Sheet, count_table, count_tables, new_sheet
+import cajs
+import cabin
+import autosave
+import clipboard
+import diagnostics
 
 class MainWindow(QMainWindow):
+    MAX_SHOWN_FLOORS = 8    # Floors keeping their widgets, least recently shown ones lose them
+    AUTOSAVE_INTERVAL = 30_000  # Milliseconds between checks of the journal
+    AUTOSAVE_EDITS = 500    # Journaled edits after which the project is snapshotted again
+    PARALLEL_BYTES = 1 << 20    # Files from this size are counted by a process per CPU, smaller ones are not worth starting them
+    saved = Signal(str, object)     # Signal emitted when background save is finished (path, error or None)
+    table_read = Signal(object, int, int, object)   # Signal emitted when a table of the file being opened is counted in the background
+                                                    # (cancel event of the opening, index, bytes read, sheet)
+    file_read = Signal(object, object)  # Signal emitted when all tables of the file are read (cancel event, error or None)
+
     def __init__(self, parent=None) -> None:
         super().__init__(parent)
         self.ui = Ui_MainWindow()
@@ -34,8 +52,10 @@ class MainWindow(QMainWindow):
         self.setWindowIcon(icon)
 
         # Setting up table
-        self.table = Table(self.ui.tableWidget, dw_checkbox=self.ui.checkBox)
+        self.table = Table(self.ui.tableView, dw_checkbox=self.ui.checkBox)
         self.table.area_sum_changed.connect(self.connect_area_widgets((self.ui.area_total, self.ui.area_dwelling, self.ui.area_economical)))
+        self.table.edited.connect(lambda edit: self.journal_edit(0, edit))
+        self.table.undoable.connect(lambda text, edit, inverse: self.push(text, 0, edit, inverse))
         self.ui.button_add_row.clicked.connect(self.table.add_row)
         self.ui.button_remove_row.clicked.connect(self.table.remove_current_row)
         self.ui.button_insert_row.clicked.connect(self.table.insert_after_current_row)
@@ -47,17 +67,38 @@ class MainWindow(QMainWindow):
         self.ui.actionSaveAs.triggered.connect(self.save_as_file)
         # self.ui.actionExport.triggered.connect(self.export_xlsx)  # not used
 
-        # Implementing 'Tab' to add new row
-        try:
-            add_hotkey('tab', self.tab_add_row)
-        except ImportError as e:    # You must be root to use this library on linux.
-            print('''"Press Tab to add new line" cannot be implemented:''')
-            print(' keyboard:', *format_exception_only(e))
+        # Undoing and redoing edits, each one is kept as the edit and the edit reverting it
+        self.undo_stack = QUndoStack(self)
+        self.undoing = False    # Edits made by undo and redo are not pushed again
+        undo_action = self.undo_stack.createUndoAction(self, "Скасувати")
+        undo_action.setShortcut(QKeySequence.Undo)
+        redo_action = self.undo_stack.createRedoAction(self, "Повторити")
+        redo_action.setShortcut(QKeySequence.Redo)
+        self.ui.menuFile.addSeparator()
+        self.ui.menuFile.addActions([undo_action, redo_action])
+
+        # Implementing 'Tab' to add new row after the window is shown
+        QTimer.singleShot(0, self.add_hotkeys)
         
-        self.ui.button_add_floor.clicked.connect(self.add_floor)
-        self.ui.button_remove_floor.clicked.connect(self.remove_floor)
+        self.ui.button_add_floor.clicked.connect(self.new_floor)
+        self.ui.button_remove_floor.clicked.connect(self.delete_floor)
         # self.ui.button_insert_floor.clicked.connect(self.insert_floor)    # Deprecated
 
+        # Saving in the background, snapshots and journal of edits for recovery after a crash
+        self.writer = autosave.Writer()
+        self.saving: Future = None  # Last background save
+        self.saved.connect(self.on_saved)
+        self.reading: tuple[str, Event, QProgressDialog] = None     # File being opened (None when recounting) in the background
+        self.pool: ProcessPoolExecutor = None   # Processes counting floors in parallel, started when first needed
+        self.table_read.connect(self.add_table)
+        self.file_read.connect(self.finish_open)
+        self.journal = autosave.Journal(os.path.join(QStandardPaths.writableLocation(QStandardPaths.GenericDataLocation), 'calcarea', 'recovery'), self.writer)
+        self.autosave_timer = QTimer(self)
+        self.autosave_timer.setInterval(self.AUTOSAVE_INTERVAL)
+        self.autosave_timer.timeout.connect(self.autosave_edits)
+        self.autosave_timer.start()
+        self.ui.tabWidget_floors.tabBar().tabMoved.connect(self.move_floor)
+
         # Current file you are working on, must be a path (full or relative)
         self.current_file: str = None
 
@@ -65,17 +106,28 @@ class MainWindow(QMainWindow):
         # list(tuple(Table, checkBox, button_add_row, button_insert_row, button_remove_row, 
         #               label_S, label_Sdw, label_Sec, area_total, area_dwelling, area_economical), ...)
         self.floors: list[Floor] = []
+        self.building = Building()      # Area sums of the floors, kept up to date by every floor
+        self.shown_floors: list[Floor] = []     # Floors with widgets, in order they were shown
+        self.archive: cabin.Archive = None      # Opened .cabin file floors are read from
         self.ui.tabWidget_floors.removeTab(0)   # Removing first demo tab (Floor n)
+        self.ui.tabWidget_floors.currentChanged.connect(self.show_floor)
 
-        # "Open with" implementation
-        if len(sys.argv) > 1:
-            file = sys.argv[1]
-            if exists(file):
-                self.open_file(path=file)
+        # "Open with" implementation, the file is opened by start() after the window is shown
+        self.startup_file: str = None
+        if len(sys.argv) > 1 and exists(sys.argv[1]):
+            self.startup_file = sys.argv[1]
 
         # Editable floor names
         self.ui.tabWidget_floors.tabBarDoubleClicked.connect(self._on_tab_bar_double_clicked)
 
+        # Diagnostics panel on F12, only if enabled by CALCAREA_DIAGNOSTICS
+        if diagnostics.enabled:
+            self.diagnostics = DiagnosticsPanel(self)
+            QShortcut(QKeySequence('F12'), self).activated.connect(self.diagnostics.show)
+
+        # Recounting all tables on F5
+        QShortcut(QKeySequence('F5'), self).activated.connect(self.recount)
+
     def connect_area_widgets(self, txt_browsers: tuple[QTextBrowser, QTextBrowser, QTextBrowser]) -> FunctionType:
         '''Returns a Slot that displays given areas in connected text browsers'''
         total_widget, dwelling_widget, economical_widget = txt_browsers
@@ -91,79 +143,248 @@ class MainWindow(QMainWindow):
             economical_widget.setText(str(area_ec))
 
         return slot
+
+    @Slot()
+    def add_hotkeys(self) -> None:
+        '''Implementing 'Tab' to add new row'''
+        try:
+            from keyboard import add_hotkey
+            add_hotkey('tab', self.tab_add_row)
+        except ImportError as e:    # You must be root to use this library on linux.
+            from traceback import format_exception_only
+            print('''"Press Tab to add new line" cannot be implemented:''')
+            print(' keyboard:', *format_exception_only(e))
+
+    @Slot()
+    def start(self) -> None:
+        '''Offering recovery, then opening the file given in the command line, called when the window is shown,
+        the session of the journal is started only then (windows which are never shown leave none)'''
+        recovered = self.recover()
+        if self.startup_file:
+            # Recovered project is offered to be saved before the file replaces it
+            if not recovered or self.ask_save() == "Accept":
+                self.open_file(path=self.startup_file)
+        elif not recovered:     # No file is opened
+            self.autosave()
+
+    def progress(self, text: str, maximum: int) -> QProgressDialog:
+        '''Progress dialog with cancel button, shown only if the operation takes longer than a moment'''
+        dialog = QProgressDialog(text, "Скасувати", 0, maximum, self)
+        dialog.setWindowModality(Qt.WindowModal)
+        dialog.setMinimumDuration(500)
+        dialog.setAutoReset(False)
+        return dialog
     
     @Slot()
+    @diagnostics.timed('open')
     def open_file(self, path: str = None) -> None:
-        '''Load tables from file'''
+        '''Load tables from file, .cajs, .cabin and .json files are read in the background (see wait_opened)'''
 
         if not path:
             path = QFileDialog.getOpenFileName(parent=self, 
                                             caption="Відкрити", 
                                             dir='', 
-                                            filter="CalcArea JSON / JavaScript Object Notation (*.cajs *.json);;Comma Separated Values (*.csv);;Всі файли (*.*)",
+                                            filter="CalcArea JSON / JavaScript Object Notation (*.cajs *.json);;CalcArea binary (*.cabin);;Comma Separated Values (*.csv);;Всі файли (*.*)",
                                             )[0]
         if path:
-            self.table.unhighlight_dw()
+            self.cancel_open()
+            self.undo_stack.clear()
             self.table.dw_rows = []
-            self.table.unhighlight_composite()
             if path.endswith('.csv'):   # For old save format support
                 self.current_file = None
                 self.setWindowTitle("Table Calculator")
                 with open(path, 'rt', encoding='utf-8') as f:
-                    rows = tuple(row.split(',') for row in f.read().split('\n'))
-                    self.table.rows = len(rows)
-                    if rows:
-                        for row in range(len(rows)):
-                            for col in range(len(rows[0])):
-                                self.table[row, col] = rows[row][col]
+                    rows = [row.split(',') for row in f.read().split('\n')]
+                self.table.set_sheet(count_table({"name": "MAIN", "table": rows}))     # Counted at once as .json files are
+                self.autosave()
                 self.save_as_file()     # Resave with new format
+                return
 
-            elif path.endswith('.json'):   # For old save format support
+            if path.endswith('.json'):   # For old save format support, resaved with new format when read
                 self.current_file = None
                 self.setWindowTitle("Table Calculator")
-                with open(path, 'rt', encoding='utf-8') as f:
-                    table, *tables = load(f)
-                    self.table.load_json(table)
-
-                    for i in range(len(self.floors)):
-                        self.remove_floor()
-                    self.floors = []
-
-                    for i in range(len(tables)):
-                        self.add_floor()
-                        self.floors[i].table_obj.load_json(tables[i])
-                self.sum_floors((0, 0))
-                self.save_as_file()     # Resave with new format
             else:
                 self.current_file = path
                 self.setWindowTitle(self.current_file)
-                self.table.highlight_row()
+            self.clear_floors()
+            self.table.highlight_row()
 
-                with open(path, 'rt', encoding='utf-8') as f:
-                    table, *tables = load(f)
-                    self.table.load(table)
-                
-                for i in range(len(self.floors)):   # Remove all existing floors
-                    self.remove_floor()
-                self.floors = []
-                
-                for i in range(len(tables)):
-                    self.add_floor(name=tables[i]["name"])
-                    self.floors[i].table_obj.load(tables[i])
-                self.sum_floors((0, 0))
+            if path.endswith('.cabin'):     # Only index is read, floor is read when its tab is shown
+                with open(path, 'rb') as f:
+                    self.archive = cabin.Archive(f)
+
+            # Tables are parsed and counted one by one in the background and added as they come,
+            # progress is the part of the file read
+            self.reading = (path, Event(), self.progress("Відкриття файлу...", 0 if self.archive is not None else os.path.getsize(path)))
+            self.reading[2].canceled.connect(self.cancel_open)
+            self.block_input(True)
+            executor = self.executor(os.path.getsize(path) >= self.PARALLEL_BYTES and self.archive is None)
+            self.writer.run(self.read_file, path, self.reading[1], self.archive, executor)
+
+    @Slot()
+    def recount(self) -> None:
+        '''Counting all tables again in the background, floors in parallel'''
+        if self.reading is not None:
+            return
+        self.flush()
+        self.sync_floor_list()
+        tables = [self.table.sheet.snapshot()]
+        for floor in self.floors:   # Floors which are not read yet are counted from the file
+            tables.append(floor._source() if floor._sheet is None else floor.sheet.snapshot())
+        for table in tables:
+            table["table"] = list(table["table"])   # Rows can be sent to other processes
+
+        self.reading = (None, Event(), self.progress("Перерахунок...", len(tables)))
+        self.reading[2].canceled.connect(self.cancel_open)
+        self.block_input(True)
+        self.writer.run(self.count_tables, self.reading[1], tables, lambda i: i+1, self.executor(len(tables) > 2))
+
+    def executor(self, parallel: bool) -> ProcessPoolExecutor | None:
+        '''Processes counting tables, None if tables are to be counted one by one'''
+        if not parallel or (os.cpu_count() or 1) < 2:
+            return None
+        if self.pool is None:   # New processes do not inherit threads of the application
+            self.pool = ProcessPoolExecutor(mp_context=get_context('spawn'))
+        return self.pool
+
+    def read_file(self, path: str, cancelled: Event, archive: cabin.Archive = None, executor: ProcessPoolExecutor = None) -> None:
+        '''Parsing and counting tables of the file in the background thread, see count_tables'''
+        try:
+            if archive is not None:
+                f = nullcontext()
+                tables = (archive[i] for i in range(min(1, len(archive))))   # Only the main table
+            elif path.endswith('.json'):
+                f = open(path, 'rt', encoding='utf-8')
+                tables = ({"name": None, "table": matrix} for matrix in load(f))    # Floors have default names
+            else:
+                f = open(path, 'rt', encoding='utf-8')
+                tables = cajs.iter_tables(f)
+        except Exception as e:
+            self.file_read.emit(cancelled, e)
+            return
+        with f:
+            self.count_tables(cancelled, tables, lambda i: f.buffer.tell() if archive is None else 0, executor)
+
+    def count_tables(self, cancelled: Event, tables: Iterable[dict], position: Callable[[int], int], executor: ProcessPoolExecutor = None) -> None:
+        '''Counting tables in the background thread (in parallel by executor if given),
+        sending them by table_read signal with the progress position of every table'''
+        try:
+            for i, sheet in enumerate(count_tables(tables, executor)):
+                if cancelled.is_set():
+                    return
+                self.table_read.emit(cancelled, i, position(i), sheet)
+        except Exception as e:
+            self.file_read.emit(cancelled, e)
+        else:
+            self.file_read.emit(cancelled, None)
+
+    @Slot(object, int, int, object)
+    def add_table(self, cancelled: Event, index: int, position: int, sheet: Sheet) -> None:
+        '''Adding table read in the background, the first one is the main table'''
+        if self.reading is None or cancelled is not self.reading[1]:
+            return  # Opening is cancelled
+        if index == 0:
+            self.table.set_sheet(sheet)
+        elif self.reading[0] is None:   # Recounted floor
+            self.floors[index-1].set_sheet(sheet)
+            self.building.set(self.floors[index-1], sheet.sums)
+        else:
+            self.add_floor(name=sheet.name, sheet=sheet)
+        self.reading[2].setValue(position)
+
+    @Slot(object, object)
+    def finish_open(self, cancelled: Event, error: Exception) -> None:
+        '''Finishing opening of the file after all tables are read'''
+        if self.reading is None or cancelled is not self.reading[1]:
+            return  # Opening is cancelled
+        path, _, dialog = self.reading
+        self.reading = None
+        dialog.deleteLater()
+        self.block_input(False)
+
+        if path is None:    # Recounted
+            self.show_building()
+            if error is not None:
+                QMessageBox.critical(self, "Перерахунок", f"Не вдалося перерахувати таблиці:\n{error}")
+            return
+
+        if error is not None:
+            self.new_project()
+            QMessageBox.critical(self, "Відкриття", f"Не вдалося відкрити {path}:\n{error}")
+            return
+
+        if self.archive is not None:
+            for i in range(1, len(self.archive)):
+                self.add_floor(name=self.archive.names[i], source=lambda i=i: self.archive[i], sums=self.archive.sums(i))
+        self.show_building()
+        if path.endswith('.json'):
+            self.autosave()
+            self.save_as_file()     # Resave with new format
+        else:
+            self.journal.start(path)    # Opened file is the base of the journal
+
+    @Slot()
+    def cancel_open(self) -> None:
+        '''Stopping the file being opened, the project is left empty (recounted tables are kept as they are)'''
+        if self.reading is None:
+            return
+        path, cancelled, dialog = self.reading
+        self.reading = None
+        cancelled.set()     # The background thread stops after the current table
+        dialog.deleteLater()
+        self.block_input(False)
+        if path is None:
+            self.show_building()
+        else:
+            self.new_project()
+
+    def new_project(self) -> None:
+        '''Starting empty project'''
+        self.current_file = None
+        self.setWindowTitle("Table Calculator")
+        self.clear_floors()
+        self.table.set_sheet(new_sheet())
+        self.undo_stack.clear()
+        self.show_building()
+        self.autosave()
+
+    def block_input(self, blocked: bool) -> None:
+        '''Blocking edits and menu actions while tables are read or recounted in the background,
+        the progress dialog is shown only after a moment and sheets are replaced as they come'''
+        self.centralWidget().setEnabled(not blocked)
+        self.menuBar().setEnabled(not blocked)
+
+    def wait_opened(self) -> None:
+        '''Waiting for the file being opened to be loaded, processing events meanwhile'''
+        while self.reading is not None:
+            QApplication.processEvents(QEventLoop.WaitForMoreEvents)
+
+    def load_tables(self, tables: Iterator[dict]) -> None:
+        '''Loading the main table and floors from tables in the form of .cajs'''
+        self.clear_floors()
+        self.undo_stack.clear()
+        for table in tables:
+            self.table.load(table)
+            break
+        QApplication.processEvents()    # Showing the main table before reading floors
+
+        # Floors are counted without widgets, these are created when the tab is shown
+        for table in tables:
+            sheet = new_sheet(table["name"], letter_default='0')
+            sheet.load(table)
+            self.add_floor(name=table["name"], sheet=sheet)
+        self.show_building()
         
     @Slot()
+    @diagnostics.timed('save')
     def save_file(self) -> str:
         '''Save tables in the current file'''
 
+        self.wait_opened()  # Saving now would overwrite the file being read with the previous project
         if self.current_file:
-            with open(self.current_file, 'wt', encoding='utf-8') as f:
-                tables = [{"name": "MAIN", "table": self.table.get_matrix(), "dw_rows": self.save_dw(self.table)}]
-
-                self.sync_floor_list()
-
-                tables = tables + [{"name": floor.tab_n.objectName(), "table": floor.table_obj.get_matrix(), "dw_rows": self.save_dw(floor.table_obj)} for floor in self.floors]
-                dump(tuple(tables), f)
+            # Values are copied and written in the background to a temporary file replacing the current one,
+            # journal starts over from the saved file
+            self.saving = self.journal.snapshot(self.snapshot(), self.current_file, self.current_file, self.saved.emit)
             return 'Success'
         else:
             return self.save_as_file()
@@ -172,19 +393,15 @@ class MainWindow(QMainWindow):
         '''Match current tab order with self.floors'''
         self.floors = sorted(self.floors, key=lambda obj: self.ui.tabWidget_floors.indexOf(obj.tab_n))
 
-    @staticmethod
-    def save_dw(table: Table) -> tuple[int]:
-        '''Get indices of rows, marked as "dwelling"'''
-        return tuple(table[item][0] for item in table.dw_rows)
-
     @Slot()
     def save_as_file(self) -> str:
         '''Save tables as a file'''
 
+        self.wait_opened()
         path = QFileDialog.getSaveFileName(parent=self, 
                                            caption="Зберегти як", 
                                            dir='save.cajs', 
-                                           filter="CalcArea JSON (*.cajs);;Всі файли (*.*)",
+                                           filter="CalcArea JSON (*.cajs);;CalcArea binary (*.cabin);;Всі файли (*.*)",
                                            )[0]
         if path:
             self.current_file = path
@@ -208,23 +425,106 @@ class MainWindow(QMainWindow):
     #         self.table.write_xlsx(path)
 
     @Slot()
-    def add_floor(self, name=None) -> None:
-        '''Adding new floor'''
+    def add_floor(self, name=None, sheet: Sheet = None, source: Callable[[], dict] = None, sums: tuple[Dec, Dec] = None) -> Floor:
+        '''Adding new floor, empty or with given values (see Floor)'''
         i = len(self.floors)
-        floor = self.create_floor(i)
+        floor = self.create_floor(i, sheet=sheet, source=source, sums=sums)
+        self.building.set(floor, floor.sums)
         if name:
             floor.tab_n.setObjectName(name)
             self.ui.tabWidget_floors.setTabText(i, name)
         self.floors.append(floor)
+        self.show_floor(self.ui.tabWidget_floors.currentIndex())
+        return floor
     
+    @Slot()
+    def new_floor(self) -> None:
+        '''Adding empty floor by user'''
+        floor = self.add_floor()
+        edit = ('add', floor.tab_n.objectName())
+        self.journal_edit(None, edit)
+        self.push("Додавання поверху", None, edit, ('remove', len(self.floors)-1))
+
+    @Slot()
+    def delete_floor(self) -> None:
+        '''Deleting current floor by user'''
+        i = self.ui.tabWidget_floors.currentIndex()
+        if i != -1:
+            floor = self.floors[i]
+            if floor.table_obj is not None:
+                floor.table_obj.flush()
+            # Values are kept to restore the floor, the file it could be read from may be overwritten meanwhile
+            table = {"table": list(floor.sheet.iter_matrix()), "dw_rows": list(floor.sheet.dw_rows)}
+            self.journal_edit(None, ('remove', i))
+            self.remove_floor()
+            self.push("Видалення поверху", None, ('remove', i), ('restore', i, floor.tab_n.objectName(), table))
+
+    @Slot(int, int)
+    def move_floor(self, i: int, j: int) -> None:
+        '''Keeping order of floors after the tab is moved'''
+        self.sync_floor_list()
+        self.journal_edit(None, ('move', i, j))
+        self.push("Переміщення поверху", None, ('move', i, j), ('move', j, i))
+
     @Slot()
     def remove_floor(self) -> None:
         '''Deleting current floor'''
         i = self.ui.tabWidget_floors.currentIndex()
         if i != -1:
-            self.ui.tabWidget_floors.removeTab(i)
+            if self.floors[i] in self.shown_floors:
+                self.shown_floors.remove(self.floors[i])
+            self.building.remove(self.floors[i])
             del self.floors[i]
+            self.ui.tabWidget_floors.removeTab(i)
+            self.show_building()
             # self.enumerate_floors()   # Deprecated
+
+    def floor_at(self, index: int) -> Floor | None:
+        '''Floor in the tab with given index'''
+        tab = self.ui.tabWidget_floors.widget(index)
+        for floor in self.floors:
+            if floor.tab_n is tab:
+                return floor
+
+    @Slot(int)
+    def show_floor(self, index: int) -> None:
+        '''Creating widgets of the floor when its tab is shown for the first time'''
+        floor = self.floor_at(index)
+        if floor is None:   # Tab is not added to the floors yet
+            return
+
+        if floor.materialise():
+            slot = self.connect_area_widgets((floor.area_total_n, floor.area_dwelling_n, floor.area_economical_n))
+            floor.table_obj.area_sum_changed.connect(slot)
+            floor.table_obj.area_sum_changed.connect(lambda areas: self.sum_floors(floor, areas))
+            floor.table_obj.edited.connect(lambda edit: self.journal_edit(1 + self.ui.tabWidget_floors.indexOf(floor.tab_n), edit))
+            floor.table_obj.undoable.connect(lambda text, edit, inverse: self.push(text, 1 + self.ui.tabWidget_floors.indexOf(floor.tab_n), edit, inverse))
+            slot(floor.sums)
+
+        if floor in self.shown_floors:
+            self.shown_floors.remove(floor)
+        self.shown_floors.append(floor)
+        while len(self.shown_floors) > self.MAX_SHOWN_FLOORS:
+            self.shown_floors.pop(0).evict()
+
+    def clear_floors(self) -> None:
+        '''Deleting all floors without showing each of the remaining ones'''
+        self.ui.tabWidget_floors.blockSignals(True)
+        try:
+            for i in range(len(self.floors)):
+                self.remove_floor()
+        finally:
+            self.ui.tabWidget_floors.blockSignals(False)
+        self.floors = []
+        self.shown_floors = []
+        self.building.clear()
+        self.close_archive()
+
+    def close_archive(self) -> None:
+        '''Closing .cabin file floors were read from'''
+        if self.archive is not None:
+            self.archive.close()
+            self.archive = None
     
     # @Slot()                               Deprecated
     # def insert_floor(self) -> None:
@@ -238,16 +538,17 @@ class MainWindow(QMainWindow):
     #     for i in range(len(self.floors)):
     #         self.ui.tabWidget_floors.setTabText(i, f"Поверх {i+1}")
     
-    @Slot(tuple)
-    def sum_floors(self, areas: tuple[Dec, Dec]) -> None:
-        '''Displaying area sum for all floors'''
-        sum_total, sum_dwelling, sum_economical = [Dec('0')]*3
+    def sum_floors(self, floor: Floor, areas: tuple[Dec, Dec]) -> None:
+        '''Updating area sum for all floors by the changed floor'''
+        if floor not in self.building.floors:   # Deleted floor counting its last edits
+            return
+        self.building.set(floor, areas)
+        self.show_building()
 
-        for floor in self.floors:
-            total_widget, dwelling_widget, economical_widget = floor.area_total_n, floor.area_dwelling_n, floor.area_economical_n
-            sum_total += Dec(total_widget.toPlainText())
-            sum_dwelling += Dec(dwelling_widget.toPlainText())
-            sum_economical += Dec(economical_widget.toPlainText())
+    def show_building(self) -> None:
+        '''Displaying area sum for all floors'''
+        # Sums of floors which are not shown yet are taken from the file
+        sum_total, sum_dwelling, sum_economical = self.building.sums
         self.ui.area_total_floor.setText(str(sum_total))
         
         self.ui.area_dwelling_floor.setText(str(sum_dwelling))
@@ -259,13 +560,13 @@ class MainWindow(QMainWindow):
         item = self.current_item()
 
         if table and item:
-            if self.current_item() == table[-1][-1]:
+            if item == (table.rows-1, table.cols-1):
                 self.ui.button_add_row.click()  # Calls self.add_row().
                 # Could've just write self.add_row() 
                 # but it somehow triggers updates frantically if running without a debug breakpoint.
     
-    def current_item(self) -> QTableWidgetItem | None:
-        '''Returns first currently selected item'''
+    def current_item(self) -> tuple[int, int] | None:
+        '''Returns coordinates of first currently selected item'''
         table = self.current_table()
         if table:
             items = table.selectedItems
@@ -278,16 +579,12 @@ class MainWindow(QMainWindow):
         if tab1 == 0:
             return self.table
         elif self.floors:
-            return self.floors[tab2].table_obj
+            return self.floors[tab2].table_obj  # None if the floor is not shown yet
     
-    def create_floor(self, indx: int, name: str = 'xxx') -> Floor:
-        '''Creates new floor'''
-        floor = Floor(name)
+    def create_floor(self, indx: int, name: str = 'xxx', **values) -> Floor:
+        '''Creates new floor, its widgets are created when the tab is shown'''
+        floor = Floor(name, **values)
         self.ui.tabWidget_floors.insertTab(indx, floor.tab_n, QIcon(), name)
-        
-        floor.table_obj.area_sum_changed.connect(self.connect_area_widgets((floor.area_total_n, floor.area_dwelling_n, floor.area_economical_n)))
-        floor.table_obj.area_sum_changed.connect(self.sum_floors)
-
         return floor
     
     @Slot(int)
@@ -310,8 +607,12 @@ class MainWindow(QMainWindow):
             new_text = editor.text().strip()
             
             if new_text:
+                old_text = self.ui.tabWidget_floors.widget(index).objectName()
                 self.ui.tabWidget_floors.setTabText(index, new_text)
                 self.ui.tabWidget_floors.widget(index).setObjectName(new_text)
+                self.journal_edit(None, ('rename', index, new_text))
+                if new_text != old_text:
+                    self.push("Перейменування поверху", None, ('rename', index, new_text), ('rename', index, old_text))
             
             editor.deleteLater()
 
@@ -320,12 +621,16 @@ class MainWindow(QMainWindow):
     def closeEvent(self, event: QCloseEvent) -> None:
         '''Trigger saving dialog before closing program'''
         if self.ask_save() == 'Accept':
+            self.journal.close()    # Waits for background saves
+            if self.pool is not None:
+                self.pool.shutdown(cancel_futures=True)
             event.accept()
         else:
             event.ignore()
     
     def ask_save(self) -> str:
         '''Saving dialog'''
+        self.wait_opened()
         while True:
             if self.current_file or len(self.floors) != 0 or self.table.rows:
                 dlg = QMessageBox(self)
@@ -336,7 +641,7 @@ class MainWindow(QMainWindow):
                 button = dlg.exec()
 
                 if button == QMessageBox.Save:
-                    if self.save_file():
+                    if self.save_file() and self.wait_saved():
                         return "Accept"
                 elif button == QMessageBox.No:
                     return "Accept"
@@ -344,154 +649,473 @@ class MainWindow(QMainWindow):
                     return "Ignore"
             else:
                 return "Accept"
-                
 
-class Item(QTableWidgetItem):
-    def __init__(self, value_type: type, value: str | Dec = None, rounding: SupportsIndex = None, *args, **kwargs) -> None:
-        super().__init__(*args, **kwargs)
-        self.value_type = value_type
-        self.rounding = rounding
-        self.value = value
+    def wait_saved(self) -> bool:
+        '''Waiting for the background save to finish, False if it failed'''
+        return self.saving is None or self.saving.exception() is None
 
-        if not value:
-            value = value_type()
-        self.default = value
+    @Slot(str, object)
+    def on_saved(self, path: str, error: BaseException) -> None:
+        '''Reporting result of background save'''
+        if error is None:
+            self.ui.statusbar.showMessage(f"Збережено: {path}", 5000)
+        else:
+            QMessageBox.critical(self, "Збереження", f"Не вдалося зберегти {path}:\n{error}")
 
-        self.setText(str(value))   
+    def flush(self) -> None:
+        '''Recalculating all scheduled changes of the tables'''
+        self.table.flush()
+        for floor in self.floors:
+            if floor.table_obj:
+                floor.table_obj.flush()
+
+    def snapshot(self) -> list[dict]:
+        '''Copy of all tables as they are saved, can be written in the background'''
+        self.flush()
+        self.sync_floor_list()
+        tables = [self.table.sheet.snapshot() | {"name": "MAIN"}]
+        tables += [floor.sheet.snapshot() | {"name": floor.tab_n.objectName()} for floor in self.floors]
+        self.close_archive()    # All floors are read, the file can be overwritten
+        return tables
 
-    def __str__(self) -> str:
-        '''Return text of the item'''
-        return str(self.text())
+    @Slot()
+    def autosave(self) -> None:
+        '''Snapshot of the project for recovery, next edits are journaled after it'''
+        if self.reading is not None:    # Opened file is snapshotted when it is read (see finish_open)
+            return
+        self.journal.snapshot(self.snapshot(), self.current_file)
 
-    def __add__(self, other) -> str | Dec:
-        '''Add values of two Items'''
-        if self.value_type != other.value_type:
-            raise TypeError(f'Items value types not matching: {self.value_type} and {other.value_type}')
-        return self.text() + other.text()
+    @Slot()
+    def autosave_edits(self) -> None:
+        '''Snapshot of the project if many edits are journaled since the last one'''
+        if self.journal.edits >= self.AUTOSAVE_EDITS:
+            self.autosave()
+
+    def journal_edit(self, index: int | None, edit: tuple) -> None:
+        '''Journaling edit of the table (0 is the main table, then floors in order of tabs)
+        or of the floors if index is None'''
+        self.journal.append([index, *edit])
+
+    def push(self, text: str, index: int | None, edit: tuple, inverse: tuple) -> None:
+        '''Adding edit already made by user to the undo stack (index as in journal_edit)'''
+        if not self.undoing:
+            self.undo_stack.push(Command(text, lambda: self.replay(index, edit), lambda: self.replay(index, inverse)))
+
+    def replay(self, index: int | None, edit: tuple) -> None:
+        '''Making edit for undo or redo, edits of tables and moves of floors journal themselves'''
+        self.undoing = True
+        try:
+            self.apply(index, edit)
+        finally:
+            self.undoing = False
+        if index is None and edit[0] != 'move':
+            self.journal_edit(index, edit)
+
+    def apply(self, index: int | None, edit: Iterable) -> None:
+        '''Repeating journaled edit'''
+        if index is not None:
+            if index == 0:
+                table = self.table
+            else:
+                self.ui.tabWidget_floors.setCurrentIndex(index-1)   # Floor widgets are created
+                table = self.floor_at(index-1).table_obj
+            table.apply(edit)
+            return
 
-    @property
-    def editable(self) -> bool:
-        return Qt.ItemIsEditable in self.flags()
-    @editable.setter
-    def editable(self, flag) -> None:
-        if flag:
-            self.setFlags(self.flags() | Qt.ItemIsEditable)
+        kind, *args = edit
+        if kind == 'add':
+            self.add_floor(name=args[0])
+        elif kind == 'remove':
+            self.ui.tabWidget_floors.setCurrentIndex(args[0])
+            self.remove_floor()
+        elif kind == 'rename':
+            i, name = args
+            self.ui.tabWidget_floors.setTabText(i, name)
+            self.ui.tabWidget_floors.widget(i).setObjectName(name)
+        elif kind == 'move':
+            self.ui.tabWidget_floors.tabBar().moveTab(*args)
+        elif kind == 'restore':     # Floor deleted by user, inserted back
+            i, name, table = args
+            sheet = new_sheet(name, letter_default='0')
+            sheet.load(table)
+            floor = self.create_floor(i, name, sheet=sheet)
+            self.floors.insert(i, floor)
+            self.building.set(floor, floor.sums)
+            self.ui.tabWidget_floors.setCurrentIndex(i)
+            self.show_floor(i)
+            self.show_building()
         else:
-            self.setFlags(self.flags() & ~Qt.ItemIsEditable)
-    
-    def setText(self, text: Any) -> None:
-        '''Setting text of the item'''
-        text = self.verify_value(text)
-        self.value = text
-
-        if self.value_type in (int, float, Dec) and self.rounding is not None:
-            text = self.round(text, self.rounding)
+            raise ValueError(f'Unknown edit {kind!r}')
+
+    def recover(self) -> bool:
+        '''Offering to restore edits left unsaved by a crashed run of the application, True if they are restored'''
+        recovered = False
+        sessions = self.journal.sessions()
+        if not sessions:
+            return recovered
+        dlg = QMessageBox(self)
+        dlg.setWindowTitle("Відновлення")
+        dlg.setText("Знайдено незбережені зміни. Відновити?")
+        dlg.setStandardButtons(QMessageBox.Yes | QMessageBox.No)
+        dlg.setIcon(QMessageBox.Question)
+
+        if dlg.exec() != QMessageBox.Yes:
+            for session in sessions:    # Declined by user
+                autosave.Journal.discard(session)
+            return recovered
 
-        super().setText(str(text))
-    
-    def set_raw_text(self, text: Any) -> None:
-        '''Setting text directly'''
-        super().setText(str(text))
-    
-    def text(self) -> str | Dec:
-        text = self.verify_value(super().text())
-        if not text:
-            self.setText(self.default)
-            return self.default
-        return text
-    
-    @staticmethod
-    def round(num: Dec, rounding: SupportsIndex) -> Dec:
-        '''Rounding to the given number of decimal places'''
-        num *= Dec('1.000000001')   # 0.5 rounding to 1
-        return round(num, rounding)
-    
-    def verify_value(self, value: Any) -> Any:
-        if not value:
-            value = self.default
+        try:
+            current_file, tables, edits = autosave.Journal.recover(sessions[0])
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Відновлення", f"Не вдалося відновити зміни:\n{e}")
+        else:
+            self.load_tables(iter(tables))
+            for index, *edit in edits:
+                self.apply(index, edit)
+            self.undo_stack.clear()     # Edits of the crashed run are not undone
+            self.current_file = current_file
+            self.setWindowTitle(self.current_file or "Table Calculator")
+            self.autosave()
+            recovered = True
+        autosave.Journal.discard(sessions[0])   # Older sessions are offered on the next start
+        return recovered
+
+
+class Command(QUndoCommand):
+    '''Edit already made by user, redone and undone by given functions'''
+    def __init__(self, text: str, redo: Callable[[], None], undo: Callable[[], None]) -> None:
+        super().__init__(text)
+        self.functions = (redo, undo)
+        self.made = True    # QUndoStack.push calls redo, but the edit is made already
+
+    def redo(self) -> None:
+        if self.made:
+            self.made = False
         else:
-            value = str(value).replace(',', '.')
-            value = str(value).replace('ё', "'")
-            try:
-                value = self.value_type(value)
-            except:
-                value = self.default
+            self.functions[0]()
+
+    def undo(self) -> None:
+        self.functions[1]()
+
+
+class TableModel(QAbstractTableModel):
+    '''Sheet values exposed to QTableView, cells are colored by the state of their rows when painted'''
+    value_changed = Signal(int, int, object)    # Signal emitted when user edits a cell (row, column, previous value)
+
+    SELECTED = QColor(255, 255, 204)    # Row with a selected item
+    DWELLING = QColor(114, 92, 52)      # "Letter" of row marked as "dwelling"
+    ADDED = QColor(255, 240, 200)       # Area of row that is added to the row above
+    SUBTRACTED = QColor(255, 200, 200)  # Area of row that is subtracted from the row above
+    HEAD = QColor(220, 255, 220)        # Area of row to which other rows are added
+    TEXT = QColor(0, 0, 0)              # Text of colored cells
+
+    def __init__(self, sheet: Sheet, headers: Iterable[str], parent: QObject = None) -> None:
+        super().__init__(parent)
+        self.sheet = sheet
+        self.sheet.changed = self.cell_changed
+        self.headers = tuple(headers)
+        self.highlighted: set[int] = set()  # Rows having a selected item
+        self.resetting: bool = False    # Whether the whole table is being replaced
+        self.silent: bool = False       # Whether changed cells are repainted later all at once
+
+        self.bold = QFont()
+        self.bold.setBold(True)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else self.sheet.rows
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else self.sheet.cols
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        row, col = index.row(), index.column()
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return self.sheet.columns[col].display(self.sheet.value(row, col))
+        if role == Qt.FontRole and col == 4:    # "Area" column is bold
+            return self.bold
+        if role == Qt.BackgroundRole:
+            return self.background(row, col)
+        if role == Qt.ForegroundRole and self.background(row, col) is not None:
+            return self.TEXT
+        return None
+
+    def background(self, row: int, col: int) -> QColor | None:
+        '''Color of the cell by the state of its row'''
+        sheet = self.sheet
+        if col == 0 and sheet.dwelling[row]:
+            return self.DWELLING
+        if col in (4, 5):
+            if sheet.lead[row]:
+                return self.ADDED if sheet.value(row, 0).startswith('+') else self.SUBTRACTED
+            if row+1 < sheet.rows and sheet.lead[row+1]:
+                return self.HEAD
+        if row in self.highlighted:
+            return self.SELECTED
+        return None
+
+    def setData(self, index: QModelIndex, value: Any, role: int = Qt.EditRole) -> bool:
+        '''Setting value edited by user'''
+        if role != Qt.EditRole or not index.isValid():
+            return False
+        previous = self.sheet.value(index.row(), index.column())
+        self.sheet.set_value(index.row(), index.column(), value)
+        self.value_changed.emit(index.row(), index.column(), previous)
+        return True
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlag:
+        flags = super().flags(index)
+        if self.sheet.columns[index.column()].editable:
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole) -> Any:
+        if orientation == Qt.Horizontal:
+            if role == Qt.DisplayRole:
+                return self.headers[section]
+            if role == Qt.FontRole and section == 4:
+                return self.bold
+            return None
+        return super().headerData(section, orientation, role)   # Row numbers
+
+    def insertRows(self, row: int, count: int, parent: QModelIndex = QModelIndex()) -> bool:
+        '''Inserting rows filled with default values'''
+        if count <= 0:
+            return False
+        self.beginInsertRows(parent, row, row+count-1)
+        self.sheet.insert_rows(row, count)
+        self.highlighted = {r+count if r >= row else r for r in self.highlighted}
+        self.endInsertRows()
+        return True
+
+    def removeRows(self, row: int, count: int, parent: QModelIndex = QModelIndex()) -> bool:
+        '''Removing rows with their values'''
+        if count <= 0:
+            return False
+        self.beginRemoveRows(parent, row, row+count-1)
+        self.sheet.remove_rows(row, count)
+        self.highlighted = {r-count if r >= row else r for r in self.highlighted if not row <= r < row+count}
+        self.endRemoveRows()
+        return True
+
+    @contextmanager
+    def reset(self) -> Iterator[None]:
+        '''Replacing the whole table at once, views are repainted only after it'''
+        self.beginResetModel()
+        self.resetting = True
+        try:
+            yield
+        finally:
+            self.resetting = False
+            self.endResetModel()
+
+    @contextmanager
+    def quiet(self) -> Iterator[None]:
+        '''Changing many cells, the caller repaints them afterwards'''
+        self.silent = True
+        try:
+            yield
+        finally:
+            self.silent = False
+
+    def cell_changed(self, row: int, col: int) -> None:
+        '''Repainting cell which value is changed'''
+        if self.resetting or self.silent:
+            return
+        index = self.index(row, col)
+        self.dataChanged.emit(index, index, (Qt.DisplayRole, Qt.EditRole))
+
+    def repaint(self, first: int, last: int, roles: tuple[int] = (Qt.BackgroundRole, Qt.ForegroundRole)) -> None:
+        '''Repainting colors (or other roles, all if empty) of rows from first to last'''
+        if self.resetting or first > last:
+            return
+        self.dataChanged.emit(self.index(first, 0), self.index(last, self.sheet.cols-1), roles)
+
+    def repaint_rows(self, rows: Iterable[int]) -> None:
+        '''Repainting colors of given rows, one signal for every run of adjacent rows'''
+        first = last = None
+        for row in sorted(rows):
+            if last is not None and row == last+1:
+                last = row
+                continue
+            if first is not None:
+                self.repaint(first, last)
+            first = last = row
+        if first is not None:
+            self.repaint(first, last)
+
+    def highlight(self, rows: set[int]) -> None:
+        '''Setting rows having a selected item, only rows that are changed are repainted'''
+        changed = rows ^ self.highlighted
+        self.highlighted = rows
+        self.repaint_rows(changed)
+
+
+def runs(rows: list[int]) -> Iterator[tuple[int, int]]:
+    '''First row and length of every run of adjacent rows in the ascending list'''
+    i = 0
+    while i < len(rows):
+        j = i
+        while j+1 < len(rows) and rows[j+1] == rows[j]+1:
+            j += 1
+        yield rows[i], j-i+1
+        i = j+1
+
+
+def first_kept(rows: list[int]) -> int:
+    '''First row not in the ascending list'''
+    row = 0
+    while row < len(rows) and rows[row] == row:
+        row += 1
+    return row
+
+
+class Row:
+    '''A read-only view of the table row, reading values only when they are accessed
+    (items are set through the table, e.g. table[row, col] = value)'''
+    __slots__ = ('table', 'index')
+
+    def __init__(self, table: Table, index: int) -> None:
+        self.table = table
+        self.index = index  # Index of the row in the table
+
+    def __getitem__(self, col: int | slice) -> (str | Dec) | tuple[str | Dec]:
+        '''Return value of the item in given column or tuple of values by given slice'''
+        if isinstance(col, slice):
+            return tuple(self.table.item(self.index, c) for c in range(self.table.cols)[col])
+        return self.table.item(self.index, range(self.table.cols)[col])
+
+    def __len__(self) -> int:
+        '''Returns amount of items in the row'''
+        return self.table.cols
+
+    def __iter__(self) -> Iterator[str | Dec]:
+        '''Returns iterator of item values in the row'''
+        return (self.table.item(self.index, col) for col in range(self.table.cols))
 
-        self.set_raw_text(value)
-        return value  
+    def __repr__(self) -> str:
+        return f'Row({self.index}, {tuple(self)})'
 
 
 class Table(QObject):
-    '''An interface to operate QTableWidgets'''
+    '''An interface to operate table views'''
     area_sum_changed = Signal(tuple)    # Signal emitted when area sums are changed
+    edited = Signal(tuple)  # Signal emitted with every edit made by user, e.g. ('set', row, col, value) (see apply)
+    undoable = Signal(str, tuple, tuple)    # Signal emitted with edit made by user that changes the table (description, edit, edit undoing it)
+    headers = ('Буква', 'Ширина', 'Довжина', 'Висота', 'Площа', "Об'єм")  # Default column titles, translated when a table is made
+    DEBOUNCE = 0    # Milliseconds of waiting for more changes before recalculation, 0 is the next event loop pass
 
-    def __init__(self, widget: QTableWidget, dw_checkbox: QCheckBox) -> None:
+    def __init__(self, widget: QTableView, dw_checkbox: QCheckBox, headers: Iterable[str] = None, sheet: Sheet = None) -> None:
         super().__init__()
+        self.sheet = sheet if sheet is not None else new_sheet()
+        titles = (QCoreApplication.translate("MainWindow", title, None) for title in headers or self.headers)
+        self.__model = TableModel(self.sheet, titles, self)
         self.__table = widget
-        self.__table.itemChanged.connect(self.update)
-        self.__table.itemSelectionChanged.connect(self.highlight_row)
-        self.__table.itemSelectionChanged.connect(self.dw_checkbox_change_state)
-        
+        self.__table.setModel(self.__model)
+        self.__model.value_changed.connect(self.cell_edited)
+        self.__table.selectionModel().selectionChanged.connect(self.highlight_row)
+        self.__table.selectionModel().selectionChanged.connect(self.dw_checkbox_change_state)
+
+        # Copying and pasting ranges of cells, e.g. from spreadsheets
+        for keys, slot in ((QKeySequence.Copy, self.copy), (QKeySequence.Paste, self.paste)):
+            shortcut = QShortcut(keys, self.__table)
+            shortcut.setContext(Qt.WidgetShortcut)
+            shortcut.activated.connect(slot)
+
         self.dw_checkbox = dw_checkbox  # Dwelling area toggle widget
-        self.dw_rows: list[int] = list()    # Indices of rows marked as "Dwelling area"
-        self.hrows: tuple[tuple[Item]] = tuple()    # Highlighted rows
-        self.comp_rows: list[Item] = list()
 
-        self.letter_default: str = 'A'
-    
-    def __getitem__(self, indx: int | Iterable[int] | Item) -> tuple[Item] | (str | Dec) | tuple[int, int]:
+        # Changes are recalculated together once they stop coming
+        self.pending: list[tuple[int, int]] = []    # Ranges of rows to recalculate
+        self.sums_changed: bool = False     # Whether area_sum_changed is to be emitted
+        self.batching: int = 0      # Depth of batch() contexts
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(self.DEBOUNCE)
+        self.timer.timeout.connect(self.flush)
+
+    def __getitem__(self, indx: int | slice | tuple[int, int]) -> Row | tuple[Row] | (str | Dec):
         '''Return row by given index
-        or return item text by given tuple of item coordinates
-        or return tuple of item coordinates of given item object'''
+        or return tuple of rows by given slice
+        or return item value by given tuple of item coordinates'''
 
         if isinstance(indx, tuple):
-            return self.__table.item(*indx).text()
-        if isinstance(indx, Item):
-            item = self.__table.indexFromItem(indx)
-            return item.row(), item.column()
-        return tuple(row for row in self)[indx]
+            return self.item(*indx)
+        if isinstance(indx, slice):
+            return tuple(Row(self, row) for row in range(self.rows)[indx])
+        return Row(self, range(self.rows)[indx])
 
     def __setitem__(self, indx: Iterable[int], value: Any) -> None:
-        '''Setting text of item with given coordinates'''
-        self.__table.item(*indx).setText(value)
-    
+        '''Setting value of item with given coordinates,
+        recalculated, journaled and undone as if the user edited it'''
+        row, col = indx
+        self.__model.setData(self.__model.index(range(self.rows)[row], range(self.cols)[col]), value)
+
     def __len__(self) -> int:
         '''Returns amount of rows in the table'''
         return self.rows
-    
-    def __iter__(self) -> Iterator[Item]:
-        '''Returns iterator of Item objects in the table'''
-        return iter(tuple(tuple(self.__table.item(row, col) for col in range(self.cols)) for row in range(self.rows)))
-    
+
+    def __iter__(self) -> Iterator[Row]:
+        '''Returns iterator of rows in the table'''
+        return (Row(self, row) for row in range(self.rows))
+
+    def item(self, row: int, col: int) -> str | Dec:
+        '''Value of the item with given coordinates'''
+        return self.sheet.value(row, col)
+
+    @property
+    def letter_default(self) -> str:
+        '''Default value of "Letter" column getter'''
+        return self.sheet.columns[0].default
+    @letter_default.setter
+    def letter_default(self, letter: str) -> None:
+        self.sheet.columns[0].default = letter
+
+    @property
+    def dw_rows(self) -> list[int]:
+        '''Indices of rows marked as "Dwelling area" getter'''
+        return self.sheet.dw_rows
+    @dw_rows.setter
+    def dw_rows(self, rows: list[int]) -> None:
+        self.sheet.dw_rows = rows
+        self.__model.repaint(0, self.rows-1)
+
+    @property
+    def hrows(self) -> tuple[int]:
+        '''Indices of highlighted rows getter'''
+        return tuple(self.__model.highlighted)
+
     @property
     def rows(self) -> int:
         '''Amount of table rows getter'''
-        return self.__table.rowCount()
+        return self.__model.rowCount()
     @rows.setter
     def rows(self, num: int) -> None:
         '''Setting amount of rows in the table
         by removing or adding new rows'''
 
+        self.flush()
         filled_rows = self.rows
-        self.__table.setRowCount(num)
-        for row in range(filled_rows, self.rows):
-            self.fill_row(row)
-    
+        if num > filled_rows:
+            self.__model.insertRows(filled_rows, num - filled_rows)
+        else:
+            self.__model.removeRows(num, filled_rows - num)
+
     @property
     def cols(self) -> int:
         '''Amount of table columns getter'''
-        return self.__table.columnCount()
-    
+        return self.__model.columnCount()
+
     @property
-    def selectedItems(self) -> list[Item]:
-        '''List of selected items getter'''
-        return self.__table.selectedItems()
-    
-    @Slot()    
+    def selectedItems(self) -> list[tuple[int, int]]:
+        '''List of coordinates of selected items getter'''
+        return [(index.row(), index.column()) for index in self.__table.selectedIndexes()]
+
+    @Slot()
     def add_row(self) -> None:
         '''Adding row to the table'''
         self.rows += 1
-    
+        self.edited.emit(('rows', self.rows))
+        self.undoable.emit("Додавання рядка", ('rows', self.rows), ('remove', [self.rows-1]))
+
     @Slot()
     def dw_checkbox_change_state(self) -> None:
         '''Update state of the checkbox based on selected items'''
@@ -505,10 +1129,10 @@ class Table(QObject):
             else:
                 self.dw_checkbox.setEnabled(True)
                 self.dw_checkbox.setChecked(False)
-                dw = False  # found a row with dwelling area 
+                dw = False  # found a row with dwelling area
                 ec = False  # found a row with economical area
                 for row in self.hrows:
-                    if row[0] in self.dw_rows:
+                    if self.sheet.dwelling[row]:
                         dw = True
                     else:
                         ec = True
@@ -525,302 +1149,418 @@ class Table(QObject):
         '''Change dwelling state of highlighted rows'''
         self.dw_checkbox.setTristate(False) # Disable third state
         state = self.dw_checkbox.checkState().value # Get checkbox state
-        if state == 0:  # If turned off
-            for row in self.hrows:
-                self.dw_rows.remove(row[0])
-        else:
-            for row in self.hrows:
-                if row[0] not in self.dw_rows:
-                    self.dw_rows.append(row[0])
-                
-        self.highlight_row()
-
-        try:
-            self.__table.blockSignals(True)
-            self.sum_area()
-        finally:
-            self.__table.blockSignals(False)
-
-    def fill_row(self, row: int) -> None:
-        '''Filling row with items with default values'''
-
-        # Temporary suppress table updates 
-        # to prevent huge amount of errors while filling row
-        self.__table.blockSignals(True)
-
-        self.__table.setItem(row, 0, Item(str, self.letter_default))    # Filling "Letter" column
+        self.set_dwelling(self.hrows, state != 0)
 
-        for col in range(1, 4): # Filling "Width", "Length" and "Height" columns with rounding to hundredths
-            self.__table.setItem(row, col, Item(Dec, rounding=2))
-        
-        area_item = Item(Dec, rounding=1)
-        area_font = area_item.font()
-        area_font.setBold(True)
-        area_item.setFont(area_font)
-        self.__table.setItem(row, 4, area_item) # Filling "Area" column with rounding to tenths
-        self.__table.setItem(row, 5, Item(Dec, rounding=0)) # Filling "Volume" column with rounding to whole numbers
-
-        for col in (4, 5):   # Setting "Area" and "Volume" columns to not editable
-            self[row][col].editable = False
+    def set_dwelling(self, rows: Iterable[int], dwelling: bool) -> None:
+        '''Marking or unmarking rows as "dwelling"'''
+        rows = list(rows)
+        changed = [row for row in rows if self.sheet.dwelling[row] != dwelling]
+        for row in changed:
+            self.sheet.set_dwelling(row, dwelling)
 
-        # Turns table updates back ON
-        self.__table.blockSignals(False)
+        self.__model.repaint_rows(changed)
+        self.schedule_sums()
+        self.edited.emit(('dw', rows, dwelling))
+        if changed:
+            self.undoable.emit("Житлова площа", ('dw', changed, dwelling), ('dw', changed, not dwelling))
 
     @Slot()
     def remove_current_row(self) -> None:
         '''Deleting selected rows'''
-        self.comp_rows = list()
-        items = list(map(lambda row: self[row[0]], self.hrows))
-        for row in map(lambda item: item[0], items[::-1]):
-            items_obj = self[row]
-            if items_obj[0] in self.dw_rows:
-                self.dw_rows.remove(items_obj[0])
-            
-            self.__table.removeRow(row)
-
-        # if items:
-        #     item = items[0]
-        #     if item[0] < self.rows:
-        #         self[item[0]][item[1]].setSelected(True)
-
-        self.update()
+        rows = sorted(self.hrows, reverse=True)
+        if not rows:
+            return
+        self.__table.clearSelection()
+        self.remove_rows(rows)
+
+    def remove_rows(self, rows: list[int]) -> None:
+        '''Deleting rows with given indices in descending order'''
+        self.flush()    # Scheduled rows are shifted by removing
+        values = [[str(self.sheet.value(row, col)) for col in range(4)] for row in reversed(rows)]  # Kept for undo
+        dwelling = [self.sheet.dwelling[row] for row in reversed(rows)]
+        top = first_kept(rows[::-1])
+        letter = self.sheet.value(top, 0) if rows[-1] == 0 and top < self.rows else None  # '+' and '-' are deleted from the new top row
+        for first, count in reversed(list(runs(rows[::-1]))):   # Adjacent rows are removed at once, the highest ones first
+            self.__model.removeRows(first, count)
+
+        # Rows between removed ones and the row above them could change their composite area,
+        # the row taking place of the lowest removed one is recalculated even if there are none (e.g. it becomes the top row)
+        self.recalculate(rows[-1]-1, max(rows[0]-len(rows), rows[-1]))
+        self.edited.emit(('remove', rows))
+        self.undoable.emit("Видалення рядків", ('remove', rows), ('put', rows[::-1], values, dwelling, letter))
+
+    def put_rows(self, rows: list[int], values: list[list[str]], dwelling: list[bool], letter: str = None) -> None:
+        '''Inserting rows with given values at given indices in ascending order, e.g. rows deleted by remove_rows,
+        letter is set to the first row after them at the top if given'''
+        self.flush()    # Scheduled rows are shifted by inserting
+        for first, count in runs(rows):
+            self.__model.insertRows(first, count)
+        with self.__model.quiet():  # Rows are repainted after recalculation
+            for row, items, dw in zip(rows, values, dwelling):
+                for col, value in enumerate(items):
+                    self.sheet.set_value(row, col, value)
+                self.sheet.set_dwelling(row, dw)
+            if letter is not None:
+                self.sheet.set_value(first_kept(rows), 0, letter)
+
+        # All inserted rows are recalculated at once, together with composite area groups around them
+        self.recalculate(rows[0]-1, rows[-1]+1)
+        self.edited.emit(('put', rows, values, dwelling, letter))
 
     @Slot()
     def insert_after_current_row(self) -> None:
         '''Inserts an empty row after the selected one or insert at the top if no selected rows'''
-        rows = list(map(lambda item: self[item][0], self.__table.selectedItems()))  #           
-        if rows:
-            self.__table.insertRow(rows[0]+1)
-            self.fill_row(rows[0]+1)
-            self.update(self[rows[0]+1][-1])
+        rows = [row for row, col in self.selectedItems]
+        self.insert_row(rows[0]+1 if rows else 0)
+
+    def insert_row(self, row: int) -> None:
+        '''Inserts an empty row at given index'''
+        self.flush()
+        self.__model.insertRows(row, 1)
+        self.update(row, 0)
+        self.edited.emit(('insert', row))
+        self.undoable.emit("Вставка рядка", ('insert', row), ('remove', [row]))
+
+    @Slot()
+    def copy(self) -> None:
+        '''Copying selected cells (the range around all of them) to the clipboard'''
+        selection = self.__table.selectionModel().selection()
+        if selection.isEmpty():
+            return
+        rows = range(min(part.top() for part in selection), max(part.bottom() for part in selection)+1)
+        cols = range(min(part.left() for part in selection), max(part.right() for part in selection)+1)
+        QApplication.clipboard().setText(clipboard.write_range(self.sheet.texts(rows, cols)))
+
+    @Slot()
+    def paste(self) -> None:
+        '''Pasting cells from the clipboard from the current cell on, the table is extended to fit them'''
+        matrix = clipboard.read_range(QApplication.clipboard().text())   # Parsed before the table is changed
+        if not matrix:
+            return
+        index = self.__table.currentIndex()
+        if index.isValid():
+            self.paste_range(index.row(), index.column(), matrix)
+        else:
+            self.paste_range(self.rows, 0, matrix)
+
+    def paste_range(self, row: int, col: int, matrix: list[list[str]], rows: int = None) -> None:
+        '''Setting values of the range with top left cell at given coordinates, cells beyond editable columns are skipped.
+        The table is resized to given amount of rows or extended to fit the range, it is recalculated at once'''
+        width = 0   # Editable columns from the first one on
+        while col+width < self.cols and self.sheet.columns[col+width].editable:
+            width += 1
+        if not width:
+            return
+        previous_rows = self.rows
+        if rows is None:
+            rows = max(previous_rows, row+len(matrix))
+        matrix = [items[:width] for items in matrix[:max(rows-row, 0)]]
+
+        self.flush()
+        previous = [[str(self.sheet.value(r, c)) for c in range(col, col+len(items))]    # Kept for undo
+                    for r, items in zip(range(row, previous_rows), matrix)]
+        if rows != previous_rows:
+            self.rows = rows
+        with self.__model.quiet():  # Rows are repainted after recalculation
+            for r, items in enumerate(matrix, row):
+                for c, value in enumerate(items, col):
+                    self.sheet.set_value(r, c, value)
+
+        # "Letter" of the first row can add it to composite area of the row above,
+        # rows removed from the end could be added to composite area of the last rows
+        self.recalculate(row-1, rows-1 if rows < previous_rows else row+len(matrix)-1)
+        self.edited.emit(('paste', row, col, matrix, rows))
+        self.undoable.emit("Вставка діапазону", ('paste', row, col, matrix, rows), ('paste', row, col, previous, previous_rows))
+
+    @Slot(int, int, object)
+    def cell_edited(self, row: int, col: int, previous: Any) -> None:
+        '''Recalculating and reporting value edited by user'''
+        self.schedule_cell(row, col)
+        value = str(self[row, col])
+        self.edited.emit(('set', row, col, value))
+        if value != str(previous):
+            self.undoable.emit("Зміна клітинки", ('set', row, col, value), ('set', row, col, str(previous)))
+
+    def apply(self, edit: Iterable) -> None:
+        '''Repeating edit reported by "edited" signal'''
+        kind, *args = edit
+        if kind == 'set':
+            row, col, value = args
+            self.__model.setData(self.__model.index(row, col), value)
+        elif kind == 'rows':
+            self.rows = args[0]
+            self.edited.emit(('rows', self.rows))
+        elif kind == 'insert':
+            self.insert_row(*args)
+        elif kind == 'remove':
+            self.remove_rows(*args)
+        elif kind == 'put':
+            self.put_rows(*args)
+        elif kind == 'paste':
+            self.paste_range(*args)
+        elif kind == 'dw':
+            self.set_dwelling(*args)
         else:
-            self.__table.insertRow(0)
-            self.fill_row(0)
-            self.update(self[0][-1])
+            raise ValueError(f'Unknown edit {kind!r}')
 
     @Slot()
     def highlight_row(self) -> None:
         '''Highlighting all rows that have a selected item'''
-        self.__table.blockSignals(True)
-        self.unhighlight()
-
-        rows_i = set(map(lambda item: self[item][0], self.__table.selectedItems())) # Get indices of rows to highlight
-        self.hrows = tuple(self[row] for row in rows_i)  # Get tuples of items to highlight
-        for row in self.hrows:
-            for item in row:
-                item.setBackground(QColor(255, 255, 204))
-                item.setForeground(QColor(0, 0, 0))
-        self.highlight_composite()
-        self.highlight_dw()
-        self.__table.blockSignals(False)
-    
-    def unhighlight(self) -> None:
-        '''Unhighliting all selected rows'''
-        for row in self.hrows:
-            for item in row:
-                try:
-                    item.setBackground(QBrush())
-                    item.setForeground(QBrush())
-                except RuntimeError:
-                    pass
-        self.hrows = tuple()
-
-    def unhighlight_all(self) -> None:
-        '''Unhighliting all rows in the table'''
-        for row in range(self.rows):
-            for col in range(self.cols):
-                self[row][col].setBackground(QBrush())
-                self[row][col].setForeground(QBrush())
-        self.hrows = tuple()
-    
-    def highlight_dw(self) -> None:
-        '''Highlight all rows marked "dwelling"'''
-        for item in self.dw_rows:
-            item.setBackground(QColor(114, 92, 52))
-            item.setForeground(QColor(0, 0, 0))
-    
-    def unhighlight_dw(self) -> None:
-        '''Unhighlight all rows marked "dwelling"'''
-        for item in self.dw_rows:
-            item.setBackground(QBrush())
-            item.setForeground(QBrush())
-
-    @Slot(QTableWidgetItem)
-    def update(self, item: Item = None) -> None:   # Takes a link to the changed item
+        rows = set()
+        for selected in self.__table.selectionModel().selection():
+            rows.update(range(selected.top(), selected.bottom()+1))
+        self.__model.highlight(rows)
+
+    @Slot(int, int)
+    @diagnostics.timed('update')
+    def update(self, row: int = None, col: int = None) -> None:   # Takes coordinates of the changed item
         '''The main table update loop'''
-        if item:
-            row, col = self[item]
-            print(f"Update triggered by [{row}][{col}]")
+        if row is not None:
+            # Changing "Letter" can add the row to composite area of the row above or remove it from there
+            self.recalculate(row-1 if col == 0 else row, row)
         else:
-            print("Update triggered by no item")
-        try:
-            # Temporary disconnecting table updates to prevent recursion
-            self.__table.blockSignals(True)
+            self.pending = []   # The whole table is recalculated
+            with self.__model.quiet():
+                rows = self.sheet.update()
+            self.refresh(rows)
 
-            self.count_area()
-            self.count_volume()
-            self.composite_area()
-            self.sum_area()
+    def recalculate(self, first: int, last: int) -> None:
+        '''Recalculating rows from first to last together with composite area groups they belong to'''
+        with self.__model.quiet():
+            rows = self.sheet.recalculate(first, last)
+        self.refresh(rows)
 
-        finally:    # Always turns table updates back ON
-            self.__table.blockSignals(False)
-
-    def count_area(self) -> None:
-        '''Updates values in "Area" column'''
-
-        for row in range(self.rows):
-            self[row, 4] = self[row, 1] * self[row, 2]
-            if self[row, 0].startswith('-'):    # Inverting area value if "Letter" column in row starts with '-'
-                self[row, 4] *= -1
-    
-    def count_volume(self) -> None:
-        '''Updates values in "Volume" column'''
-
-        for row in range(self.rows):
-            self[row, 5] = self[row, 3] * self[row, 4]
-
-    def sum_area(self) -> None:
-        '''Updates area sum'''
+    @property
+    def debounce(self) -> int:
+        '''Milliseconds of waiting for more changes before recalculation getter'''
+        return self.timer.interval()
+    @debounce.setter
+    def debounce(self, msec: int) -> None:
+        self.timer.setInterval(msec)
+
+    @Slot(int, int)
+    def schedule_cell(self, row: int, col: int) -> None:
+        '''Scheduling recalculation after the item is changed'''
+        # Changing "Letter" can add the row to composite area of the row above or remove it from there
+        self.schedule(row-1 if col == 0 else row, row)
+
+    def schedule(self, first: int, last: int) -> None:
+        '''Scheduling recalculation of rows from first to last together with other changes'''
+        self.pending.append((first, last))
+        self.sums_changed = True
+        if not self.batching:
+            self.timer.start()  # Restarting waiting for more changes
+
+    def schedule_sums(self) -> None:
+        '''Scheduling emitting of area sums'''
+        self.sums_changed = True
+        if not self.batching:
+            self.timer.start()
 
-        sum_ = Dec('0')     # Total area
-        sum_a = Dec('0')    # Dwelling area
+    @Slot()
+    @diagnostics.timed('flush')
+    def flush(self) -> None:
+        '''Recalculating scheduled rows now, area sums are emitted once'''
+        self.timer.stop()
+        if self.pending:
+            ranges = sorted(self.pending)
+            self.pending = []
+            first, last = ranges[0]
+            for start, stop in ranges[1:]:  # Overlapping and adjacent ranges are recalculated at once
+                if start <= last+1:
+                    last = max(last, stop)
+                else:
+                    with self.__model.quiet():
+                        rows = self.sheet.recalculate(first, last)
+                    self.repaint(rows)
+                    first, last = start, stop
+            with self.__model.quiet():
+                rows = self.sheet.recalculate(first, last)
+            self.repaint(rows)
+        if self.sums_changed:
+            self.sums_changed = False
+            self.area_sum_changed.emit(self.sheet.sums)
+
+    @contextmanager
+    def batch(self) -> Iterator[Table]:
+        '''Making many edits with one recalculation at the end'''
+        self.batching += 1
+        try:
+            yield self
+        finally:
+            self.batching -= 1
+            if not self.batching:
+                self.flush()
 
-        for row in range(len(self)):
-            if self[row, 0][0].startswith(('+', '-')):  # If "Letter" starts with '+' or '-' not adding to the sum
-                continue
-            sum_ += self[row, 4]
-            
-            
-            if self[row][0] in self.dw_rows:
-                sum_a += self[row, 4]
+    def repaint(self, rows: range) -> None:
+        '''Repainting values and colors of recalculated rows'''
+        if rows:
+            self.__model.repaint(rows.start, rows.stop-1, ())
 
+    def refresh(self, rows: range) -> None:
+        '''Repainting recalculated rows and emitting new area sums'''
+        self.repaint(rows)
+        self.sums_changed = False
         # Emits the signal with tuple of counted sums as an argument
-        self.area_sum_changed.emit((sum_, sum_a))
-
-    def composite_area(self) -> None:
-        '''If row has first character '+' in "Letter" column it will add it's area value to previous row value'''
-        if self.rows and self[0, 0].startswith(('+', '-')):
-            self[0, 0] = self[0, 0].lstrip('+-')    # Deleting '+' and '-' from "Letter" value if it has no rows above
-            self.count_area()
-            self.count_volume()
-            self.composite_area()
-            return
+        self.area_sum_changed.emit(self.sheet.sums)
+
+    def set_sheet(self, sheet: Sheet) -> None:
+        '''Replacing values of the table with the already counted sheet'''
+        with self.__model.reset():
+            self.__model.highlight(set())
+            self.pending = []
+            sheet.changed = self.__model.cell_changed
+            self.sheet = self.__model.sheet = sheet
+            self.refresh(range(sheet.rows))
+        self.dw_checkbox_change_state()
 
-        # Starting iteration of table rows in reverse,
-        # so it can sum area values by chain to the top row, that has no '+'
-        for row in range(self.rows-1, -1, -1):
-            if self[row, 0].startswith(('+', '-')):
-                for col in (4, self.cols-1):
-                    self[row-1, col] = self[row-1][col].value + self[row][col].value
-            self.highlight_composite()
-
-    def highlight_composite(self) -> None:
-        '''Highlight items associated with composite area calculation'''
-        self.unhighlight_composite()
-        for row in range(self.rows-1, -1, -1):
-            if self[row, 0].startswith('+'):
-                for col in (4, 5):
-                    self[row][col].setBackground(QColor(255, 240, 200))     # Highlighting row that is added
-                    self[row][col].setForeground(QColor(0, 0, 0))
-                    self[row-1][col].setBackground(QColor(220, 255, 220))   # Highlighting row to which is added with different color
-                    self[row-1][col].setForeground(QColor(0, 0, 0))
-
-                    for r in (row, row-1):
-                            item = self[r][col]
-                            if item not in self.comp_rows:
-                                self.comp_rows.append(item)
-
-            elif self[row, 0].startswith('-'):
-                for col in (4, 5):
-                    self[row][col].setBackground(QColor(255, 200, 200))     # Highlighting row that is subtracted with another color
-                    self[row][col].setForeground(QColor(0, 0, 0))
-                    self[row-1][col].setBackground(QColor(220, 255, 220))   # Highlighting row to which is added with different color
-                    self[row-1][col].setForeground(QColor(0, 0, 0))
-
-                    for r in (row, row-1):
-                            item = self[r][col]
-                            if item not in self.comp_rows:
-                                self.comp_rows.append(item)
-
-    def unhighlight_composite(self) -> None:
-        '''Unhighlight items previously highlighted as composite area'''
-        for item in self.comp_rows:
-            try:
-                if any((item in row for row in self.hrows)):
-                    item.setBackground(QColor(255, 255, 204))
-                    item.setForeground(QColor(0, 0, 0))
-                else:
-                    item.setBackground(QBrush())
-                    item.setForeground(QBrush())
-            except RuntimeError:    # Occurs when stumbling upon a reference to already deleted Item object
-                pass
-        self.comp_rows = []
-
-    def load_json(self, matrix: Iterable[Iterable]) -> None:    # For legacy .json support
-        '''Loading table from matrix (.json file type)'''
-        try:
-            self.__table.itemChanged.disconnect(self.update)    # The only found way it doesn't cause update on each item
-            self.rows = len(matrix)
-            if matrix:
-                for row in range(len(matrix)):
-                    for col in range(len(matrix[0])):
-                        self[row, col] = matrix[row][col]
-        finally:
-            self.__table.itemChanged.connect(self.update)
-            self.update()
-    
     def load(self, table: dict) -> None:
         '''Loading table from dictionary'''
-        try:
-            self.__table.itemChanged.disconnect(self.update)    # The only found way it doesn't cause update on each item
-
-            matrix = table["table"]
-            self.rows = len(matrix)
-            if matrix:
-                for row in range(len(matrix)):
-                    for col in range(len(matrix[0])):
-                        self[row, col] = matrix[row][col]
-            self.dw_rows = list(self[row_i][0] for row_i in table["dw_rows"])
-            self.dw_checkbox_change_state()
-            self.highlight_dw()
-        finally:
-            self.__table.itemChanged.connect(self.update)
-            self.update()
+        with self.__model.reset():
+            self.__model.highlight(set())
+            self.pending = []
+            self.refresh(self.sheet.load(table))
+        self.dw_checkbox_change_state()
 
     def get_matrix(self) -> tuple[tuple]:
         '''Get matrix of table items'''
-        try:
-            # Temporary disconnecting table updates to prevent recursion
-            self.__table.blockSignals(True)
-            res = tuple(tuple(str(self[row, col]) for col in range(self.cols))[:-2] for row in range(self.rows))
-        finally:
-            self.__table.blockSignals(False)
-        return res
-    
+        return self.sheet.get_matrix()
+
     # def write_xlsx(self, path: str) -> None:
     #     '''Exporting table to .xlsx (currently not used)'''
 
     #     wb = Workbook()
     #     ws = wb.active
     #     for row in self:
-    #         ws.append(tuple(map(lambda item: item.text(), row)))
+    #         ws.append(tuple(map(str, row)))
     #     wb.save(path)
 
 
+class DiagnosticsPanel(QWidget):
+    '''Window with timers of table operations and cProfile toggle'''
+    def __init__(self, parent: QWidget = None) -> None:
+        super().__init__(parent, Qt.Window)
+        self.setWindowTitle('Діагностика')
+        self.resize(560, 420)
+
+        self.text = QTextBrowser(self)
+        self.text.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        self.profile = QCheckBox('cProfile', self)
+        self.profile.toggled.connect(self.toggle_profile)
+        self.button_reset = QPushButton('Скинути', self)
+        self.button_reset.clicked.connect(self.reset)
+
+        buttons = QHBoxLayout()
+        buttons.addWidget(self.profile)
+        buttons.addStretch()
+        buttons.addWidget(self.button_reset)
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.text)
+        layout.addLayout(buttons)
+
+        # Refreshing counters only while the panel is shown
+        self.timer = QTimer(self)
+        self.timer.setInterval(500)
+        self.timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event) -> None:
+        self.refresh()
+        self.timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event) -> None:
+        self.timer.stop()
+        super().hideEvent(event)
+
+    @Slot()
+    def refresh(self) -> None:
+        '''Displaying current counters'''
+        self.text.setPlainText(diagnostics.report())
+
+    @Slot()
+    def reset(self) -> None:
+        '''Clearing counters'''
+        diagnostics.reset()
+        self.refresh()
+
+    @Slot(bool)
+    def toggle_profile(self, checked: bool) -> None:
+        '''Starting cProfile capture or stopping it and saving stats to a file'''
+        if checked:
+            diagnostics.start_profile()
+        else:
+            path = QFileDialog.getSaveFileName(parent=self,
+                                               caption="Зберегти профіль",
+                                               dir='calcarea.prof',
+                                               filter="cProfile (*.prof);;Всі файли (*.*)",
+                                               )[0]
+            diagnostics.stop_profile(path)
+
+
 class Floor:
-    def __init__(self, name: str) -> None:
+    '''Floor tab with its table, widgets are created only when the tab is shown.
+    Values are either given as a sheet or read from source when needed,
+    until then the area sums saved in the file are used'''
+    def __init__(self, name: str, sheet: Sheet = None, source: Callable[[], dict] = None, sums: tuple[Dec, Dec] = None) -> None:
+        self.tab_n = QWidget()
+        self.tab_n.setObjectName(name)
+        self.tab_layout = QHBoxLayout(self.tab_n)
+        self.tab_layout.setContentsMargins(0, 0, 0, 0)
+
+        self.table_obj: Table = None    # Created with widgets
+        if sheet is None and source is None:
+            sheet = new_sheet(name, letter_default='0')
+        self._sheet = sheet
+        self._source = source
+        self._sums = sums
+
+    @property
+    def sheet(self) -> Sheet:
+        '''Values of the floor, read from the source on first access'''
+        if self._sheet is None:
+            table = self._source()
+            self._sheet = new_sheet(table["name"], letter_default='0')
+            self._sheet.load(table)
+            self._source = None
+        return self._sheet
+
+    @property
+    def sums(self) -> tuple[Dec, Dec]:
+        '''Total and dwelling area of the floor'''
+        if self._sheet is None and self._sums is not None:
+            return self._sums
+        return self.sheet.sums
+
+    def set_sheet(self, sheet: Sheet) -> None:
+        '''Replacing values of the floor with the already counted sheet'''
+        self._sheet = sheet
+        self._source = None
+        if self.table_obj is not None:
+            self.table_obj.set_sheet(sheet)
+
+    def materialise(self) -> bool:
+        '''Creating widgets and table of the floor, False if they already exist'''
+        if self.table_obj is not None:
+            return False
         self.setupUi()
         self.retranslateUi()
 
-        self.table_obj = Table(self.tableWidget_n, self.checkBox_n)
+        self.table_obj = Table(self.tableView_n, self.checkBox_n, headers=('Номер', *Table.headers[1:]), sheet=self.sheet)
         self.table_obj.letter_default = '0'
 
         self.button_add_row_n.clicked.connect(self.table_obj.add_row)
         self.button_insert_row_n.clicked.connect(self.table_obj.insert_after_current_row)
         self.button_remove_row_n.clicked.connect(self.table_obj.remove_current_row)
         self.checkBox_n.checkStateChanged.connect(self.table_obj.dw_change)
+        return True
 
-        self.tab_n.setObjectName(name)
+    def evict(self) -> None:
+        '''Deleting widgets and table of the floor, values are kept'''
+        if self.table_obj is None:
+            return
+        self.table_obj.flush()
+        self.page_n.deleteLater()
+        self.table_obj = None
 
     def setupUi(self) -> None:
         '''Set up floor widgets'''
@@ -835,34 +1575,17 @@ class Floor:
         sizePolicy1.setHorizontalStretch(0)
         sizePolicy1.setVerticalStretch(0)
 
-        self.tab_n = QWidget()
-        self.tab_n.setObjectName(u"tab_n")
-        self.horizontalLayout = QHBoxLayout(self.tab_n)
+        self.page_n = QWidget(self.tab_n)
+        self.page_n.setObjectName(u"page_n")
+        self.horizontalLayout = QHBoxLayout(self.page_n)
         self.horizontalLayout.setObjectName(u"horizontalLayout")
-        self.tableWidget_n = QTableWidget(self.tab_n)
-        if (self.tableWidget_n.columnCount() < 6):
-            self.tableWidget_n.setColumnCount(6)
-        __qtablewidgetitem6 = QTableWidgetItem()
-        self.tableWidget_n.setHorizontalHeaderItem(0, __qtablewidgetitem6)
-        __qtablewidgetitem7 = QTableWidgetItem()
-        self.tableWidget_n.setHorizontalHeaderItem(1, __qtablewidgetitem7)
-        __qtablewidgetitem8 = QTableWidgetItem()
-        self.tableWidget_n.setHorizontalHeaderItem(2, __qtablewidgetitem8)
-        __qtablewidgetitem9 = QTableWidgetItem()
-        self.tableWidget_n.setHorizontalHeaderItem(3, __qtablewidgetitem9)
-        font3 = QFont()
-        font3.setBold(True)
-        __qtablewidgetitem10 = QTableWidgetItem()
-        __qtablewidgetitem10.setFont(font3)
-        self.tableWidget_n.setHorizontalHeaderItem(4, __qtablewidgetitem10)
-        __qtablewidgetitem11 = QTableWidgetItem()
-        self.tableWidget_n.setHorizontalHeaderItem(5, __qtablewidgetitem11)
-        self.tableWidget_n.setObjectName(u"tableWidget_n")
-        self.tableWidget_n.horizontalHeader().setDefaultSectionSize(70)
-
-        self.horizontalLayout.addWidget(self.tableWidget_n)
-
-        self.container_n = QWidget(self.tab_n)
+        self.tableView_n = QTableView(self.page_n)
+        self.tableView_n.setObjectName(u"tableView_n")
+        self.tableView_n.horizontalHeader().setDefaultSectionSize(70)
+
+        self.horizontalLayout.addWidget(self.tableView_n)
+
+        self.container_n = QWidget(self.page_n)
         self.container_n.setObjectName(u"container_n")
         sizePolicy1.setHeightForWidth(self.container_n.sizePolicy().hasHeightForWidth())
         self.container_n.setSizePolicy(sizePolicy1)
@@ -911,24 +1634,13 @@ class Floor:
         self.button_insert_row_n.setGeometry(QRect(0, 30, 101, 25))
 
         self.horizontalLayout.addWidget(self.container_n)
+        self.tab_layout.addWidget(self.page_n)
 
-        self.tableWidget_n.show()
+        self.tableView_n.show()
         self.container_n.show()
 
     def retranslateUi(self) -> None:
         '''Set up text on widgets'''
-        ___qtablewidgetitem6 = self.tableWidget_n.horizontalHeaderItem(0)
-        ___qtablewidgetitem6.setText(QCoreApplication.translate("MainWindow", u"\u041d\u043e\u043c\u0435\u0440", None))
-        ___qtablewidgetitem7 = self.tableWidget_n.horizontalHeaderItem(1)
-        ___qtablewidgetitem7.setText(QCoreApplication.translate("MainWindow", u"\u0428\u0438\u0440\u0438\u043d\u0430", None))
-        ___qtablewidgetitem8 = self.tableWidget_n.horizontalHeaderItem(2)
-        ___qtablewidgetitem8.setText(QCoreApplication.translate("MainWindow", u"\u0414\u043e\u0432\u0436\u0438\u043d\u0430", None))
-        ___qtablewidgetitem9 = self.tableWidget_n.horizontalHeaderItem(3)
-        ___qtablewidgetitem9.setText(QCoreApplication.translate("MainWindow", u"\u0412\u0438\u0441\u043e\u0442\u0430", None))
-        ___qtablewidgetitem10 = self.tableWidget_n.horizontalHeaderItem(4)
-        ___qtablewidgetitem10.setText(QCoreApplication.translate("MainWindow", u"\u041f\u043b\u043e\u0449\u0430", None))
-        ___qtablewidgetitem11 = self.tableWidget_n.horizontalHeaderItem(5)
-        ___qtablewidgetitem11.setText(QCoreApplication.translate("MainWindow", u"\u041e\u0431'\u0454\u043c", None))
         self.area_dwelling_n.setHtml(QCoreApplication.translate("MainWindow", u"<!DOCTYPE HTML PUBLIC \"-//W3C//DTD HTML 4.0//EN\" \"http://www.w3.org/TR/REC-html40/strict.dtd\">\n"
 "<html><head><meta name=\"qrichtext\" content=\"1\" /><meta charset=\"utf-8\" /><style type=\"text/css\">\n"
 "p, li { white-space: pre-wrap; }\n"
@@ -963,6 +1675,7 @@ class Floor:
 
 def excepthook(cls: type, exception: Exception, traceback) -> None:
     '''Catches errors and showing them in dialog box'''
+    from traceback import format_exception_only, format_exception
     
     exc_type = cls.__name__                         # Type of the exception (e. g. "ZeroDivisionError")
     exc = ''.join(format_exception_only(exception)) # Exception type with message (e. g. "ZeroDivisionError: division by zero")
@@ -978,7 +1691,10 @@ def excepthook(cls: type, exception: Exception, traceback) -> None:
     msg.addButton('OK', QMessageBox.YesRole)
     
     copy_button = msg.addButton('Копіювати', QMessageBox.ActionRole)
-    copy_button.clicked.connect(lambda: copy(exc_full)) # Copying to clipboard
+    def copy_to_clipboard() -> None:
+        from pyperclip import copy
+        copy(exc_full)
+    copy_button.clicked.connect(copy_to_clipboard) # Copying to clipboard
     
     terminate_program_button = msg.addButton('Зупинити', QMessageBox.ActionRole)
     terminate_program_button.clicked.connect(lambda: sys.exit(1)) # Terminating program
@@ -990,4 +1706,5 @@ if __name__ == "__main__":
     app = QApplication(sys.argv)
     widget = MainWindow()
     widget.show()
+    QTimer.singleShot(0, widget.start)  # Opening file after the window is painted
     sys.exit(app.exec())
\ No newline at end of file
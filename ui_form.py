@@ -3,7 +3,7 @@
 ################################################################################
 ## Form generated from reading UI file 'form.ui'
 ##
-## Created by: Qt User Interface Compiler version 6.11.0
+## Created by: Qt User Interface Compiler version 6.12.0
 ##
 ## WARNING! All changes made in this file will be lost when recompiling UI file!
 ################################################################################
@@ -19,8 +19,8 @@ from PySide6.QtGui import (QAction, QBrush, QColor, QConicalGradient,
 from PySide6.QtWidgets import (QAbstractItemView, QApplication, QCheckBox, QHBoxLayout,
     QHeaderView, QLabel, QMainWindow, QMenu,
     QMenuBar, QPushButton, QSizePolicy, QStatusBar,
-    QTabWidget, QTableWidget, QTableWidgetItem, QTextBrowser,
-    QVBoxLayout, QWidget)
+    QTabWidget, QTableView, QTextBrowser, QVBoxLayout,
+    QWidget)
 
 class Ui_MainWindow(object):
     def setupUi(self, MainWindow):
@@ -54,35 +54,16 @@ class Ui_MainWindow(object):
         self.tab.setObjectName(u"tab")
         self.horizontalLayout_2 = QHBoxLayout(self.tab)
         self.horizontalLayout_2.setObjectName(u"horizontalLayout_2")
-        self.tableWidget = QTableWidget(self.tab)
-        if (self.tableWidget.columnCount() < 6):
-            self.tableWidget.setColumnCount(6)
-        __qtablewidgetitem = QTableWidgetItem()
-        self.tableWidget.setHorizontalHeaderItem(0, __qtablewidgetitem)
-        __qtablewidgetitem1 = QTableWidgetItem()
-        self.tableWidget.setHorizontalHeaderItem(1, __qtablewidgetitem1)
-        __qtablewidgetitem2 = QTableWidgetItem()
-        self.tableWidget.setHorizontalHeaderItem(2, __qtablewidgetitem2)
-        __qtablewidgetitem3 = QTableWidgetItem()
-        self.tableWidget.setHorizontalHeaderItem(3, __qtablewidgetitem3)
-        font = QFont()
-        font.setBold(True)
-        font.setItalic(False)
-        font.setUnderline(False)
-        __qtablewidgetitem4 = QTableWidgetItem()
-        __qtablewidgetitem4.setFont(font)
-        self.tableWidget.setHorizontalHeaderItem(4, __qtablewidgetitem4)
-        __qtablewidgetitem5 = QTableWidgetItem()
-        self.tableWidget.setHorizontalHeaderItem(5, __qtablewidgetitem5)
-        self.tableWidget.setObjectName(u"tableWidget")
-        sizePolicy.setHeightForWidth(self.tableWidget.sizePolicy().hasHeightForWidth())
-        self.tableWidget.setSizePolicy(sizePolicy)
-        self.tableWidget.setDragEnabled(False)
-        self.tableWidget.setDragDropMode(QAbstractItemView.DragDropMode.NoDragDrop)
-        self.tableWidget.setAlternatingRowColors(False)
-        self.tableWidget.horizontalHeader().setDefaultSectionSize(70)
+        self.tableView = QTableView(self.tab)
+        self.tableView.setObjectName(u"tableView")
+        sizePolicy.setHeightForWidth(self.tableView.sizePolicy().hasHeightForWidth())
+        self.tableView.setSizePolicy(sizePolicy)
+        self.tableView.setDragEnabled(False)
+        self.tableView.setDragDropMode(QAbstractItemView.DragDropMode.NoDragDrop)
+        self.tableView.setAlternatingRowColors(False)
+        self.tableView.horizontalHeader().setDefaultSectionSize(70)
 
-        self.horizontalLayout_2.addWidget(self.tableWidget)
+        self.horizontalLayout_2.addWidget(self.tableView)
 
         self.container_main = QWidget(self.tab)
         self.container_main.setObjectName(u"container_main")
@@ -101,9 +82,9 @@ class Ui_MainWindow(object):
         self.label_Sec = QLabel(self.container_main)
         self.label_Sec.setObjectName(u"label_Sec")
         self.label_Sec.setGeometry(QRect(0, 140, 101, 31))
-        font1 = QFont()
-        font1.setPointSize(12)
-        self.label_Sec.setFont(font1)
+        font = QFont()
+        font.setPointSize(12)
+        self.label_Sec.setFont(font)
         self.label_Sec.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.area_total = QTextBrowser(self.container_main)
         self.area_total.setObjectName(u"area_total")
@@ -111,10 +92,10 @@ class Ui_MainWindow(object):
         self.label_S = QLabel(self.container_main)
         self.label_S.setObjectName(u"label_S")
         self.label_S.setGeometry(QRect(0, 170, 101, 31))
-        font2 = QFont()
-        font2.setPointSize(12)
-        font2.setBold(True)
-        self.label_S.setFont(font2)
+        font1 = QFont()
+        font1.setPointSize(12)
+        font1.setBold(True)
+        self.label_S.setFont(font1)
         self.label_S.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.button_add_row = QPushButton(self.container_main)
         self.button_add_row.setObjectName(u"button_add_row")
@@ -137,7 +118,7 @@ class Ui_MainWindow(object):
         self.label_Sdw = QLabel(self.container_main)
         self.label_Sdw.setObjectName(u"label_Sdw")
         self.label_Sdw.setGeometry(QRect(0, 110, 101, 31))
-        self.label_Sdw.setFont(font1)
+        self.label_Sdw.setFont(font)
         self.label_Sdw.setAlignment(Qt.AlignmentFlag.AlignCenter)
 
         self.horizontalLayout_2.addWidget(self.container_main)
@@ -159,28 +140,11 @@ class Ui_MainWindow(object):
         self.tab_n.setObjectName(u"tab_n")
         self.horizontalLayout = QHBoxLayout(self.tab_n)
         self.horizontalLayout.setObjectName(u"horizontalLayout")
-        self.tableWidget_n = QTableWidget(self.tab_n)
-        if (self.tableWidget_n.columnCount() < 6):
-            self.tableWidget_n.setColumnCount(6)
-        __qtablewidgetitem6 = QTableWidgetItem()
-        self.tableWidget_n.setHorizontalHeaderItem(0, __qtablewidgetitem6)
-        __qtablewidgetitem7 = QTableWidgetItem()
-        self.tableWidget_n.setHorizontalHeaderItem(1, __qtablewidgetitem7)
-        __qtablewidgetitem8 = QTableWidgetItem()
-        self.tableWidget_n.setHorizontalHeaderItem(2, __qtablewidgetitem8)
-        __qtablewidgetitem9 = QTableWidgetItem()
-        self.tableWidget_n.setHorizontalHeaderItem(3, __qtablewidgetitem9)
-        font3 = QFont()
-        font3.setBold(True)
-        __qtablewidgetitem10 = QTableWidgetItem()
-        __qtablewidgetitem10.setFont(font3)
-        self.tableWidget_n.setHorizontalHeaderItem(4, __qtablewidgetitem10)
-        __qtablewidgetitem11 = QTableWidgetItem()
-        self.tableWidget_n.setHorizontalHeaderItem(5, __qtablewidgetitem11)
-        self.tableWidget_n.setObjectName(u"tableWidget_n")
-        self.tableWidget_n.horizontalHeader().setDefaultSectionSize(70)
+        self.tableView_n = QTableView(self.tab_n)
+        self.tableView_n.setObjectName(u"tableView_n")
+        self.tableView_n.horizontalHeader().setDefaultSectionSize(70)
 
-        self.horizontalLayout.addWidget(self.tableWidget_n)
+        self.horizontalLayout.addWidget(self.tableView_n)
 
         self.container_n = QWidget(self.tab_n)
         self.container_n.setObjectName(u"container_n")
@@ -199,7 +163,7 @@ class Ui_MainWindow(object):
         self.label_Sdw_n = QLabel(self.container_n)
         self.label_Sdw_n.setObjectName(u"label_Sdw_n")
         self.label_Sdw_n.setGeometry(QRect(0, 110, 101, 31))
-        self.label_Sdw_n.setFont(font1)
+        self.label_Sdw_n.setFont(font)
         self.label_Sdw_n.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.button_remove_row_n = QPushButton(self.container_n)
         self.button_remove_row_n.setObjectName(u"button_remove_row_n")
@@ -210,12 +174,12 @@ class Ui_MainWindow(object):
         self.label_S_n = QLabel(self.container_n)
         self.label_S_n.setObjectName(u"label_S_n")
         self.label_S_n.setGeometry(QRect(0, 170, 101, 31))
-        self.label_S_n.setFont(font2)
+        self.label_S_n.setFont(font1)
         self.label_S_n.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.label_Sec_n = QLabel(self.container_n)
         self.label_Sec_n.setObjectName(u"label_Sec_n")
         self.label_Sec_n.setGeometry(QRect(0, 140, 101, 31))
-        self.label_Sec_n.setFont(font1)
+        self.label_Sec_n.setFont(font)
         self.label_Sec_n.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.checkBox_n = QCheckBox(self.container_n)
         self.checkBox_n.setObjectName(u"checkBox_n")
@@ -256,17 +220,17 @@ class Ui_MainWindow(object):
         self.label_S_floor = QLabel(self.container_floor)
         self.label_S_floor.setObjectName(u"label_S_floor")
         self.label_S_floor.setGeometry(QRect(470, 50, 101, 31))
-        self.label_S_floor.setFont(font2)
+        self.label_S_floor.setFont(font1)
         self.label_S_floor.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.label_Sdw_floor = QLabel(self.container_floor)
         self.label_Sdw_floor.setObjectName(u"label_Sdw_floor")
         self.label_Sdw_floor.setGeometry(QRect(0, 50, 101, 31))
-        self.label_Sdw_floor.setFont(font1)
+        self.label_Sdw_floor.setFont(font)
         self.label_Sdw_floor.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.label_Sec_floor = QLabel(self.container_floor)
         self.label_Sec_floor.setObjectName(u"label_Sec_floor")
         self.label_Sec_floor.setGeometry(QRect(230, 50, 101, 31))
-        self.label_Sec_floor.setFont(font1)
+        self.label_Sec_floor.setFont(font)
         self.label_Sec_floor.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.area_economical_floor = QTextBrowser(self.container_floor)
         self.area_economical_floor.setObjectName(u"area_economical_floor")
@@ -319,18 +283,6 @@ class Ui_MainWindow(object):
 #endif // QT_CONFIG(shortcut)
         self.actionSaveAs.setText(QCoreApplication.translate("MainWindow", u"\u0417\u0431\u0435\u0440\u0435\u0433\u0442\u0438 \u044f\u043a", None))
         self.actionExport.setText(QCoreApplication.translate("MainWindow", u"\u0415\u043a\u0441\u043f\u043e\u0440\u0442\u0443\u0432\u0430\u0442\u0438 \u0432 Excel", None))
-        ___qtablewidgetitem = self.tableWidget.horizontalHeaderItem(0)
-        ___qtablewidgetitem.setText(QCoreApplication.translate("MainWindow", u"\u0411\u0443\u043a\u0432\u0430", None))
-        ___qtablewidgetitem1 = self.tableWidget.horizontalHeaderItem(1)
-        ___qtablewidgetitem1.setText(QCoreApplication.translate("MainWindow", u"\u0428\u0438\u0440\u0438\u043d\u0430", None))
-        ___qtablewidgetitem2 = self.tableWidget.horizontalHeaderItem(2)
-        ___qtablewidgetitem2.setText(QCoreApplication.translate("MainWindow", u"\u0414\u043e\u0432\u0436\u0438\u043d\u0430", None))
-        ___qtablewidgetitem3 = self.tableWidget.horizontalHeaderItem(3)
-        ___qtablewidgetitem3.setText(QCoreApplication.translate("MainWindow", u"\u0412\u0438\u0441\u043e\u0442\u0430", None))
-        ___qtablewidgetitem4 = self.tableWidget.horizontalHeaderItem(4)
-        ___qtablewidgetitem4.setText(QCoreApplication.translate("MainWindow", u"\u041f\u043b\u043e\u0449\u0430", None))
-        ___qtablewidgetitem5 = self.tableWidget.horizontalHeaderItem(5)
-        ___qtablewidgetitem5.setText(QCoreApplication.translate("MainWindow", u"\u041e\u0431'\u0454\u043c", None))
         self.area_dwelling.setHtml(QCoreApplication.translate("MainWindow", u"<!DOCTYPE HTML PUBLIC \"-//W3C//DTD HTML 4.0//EN\" \"http://www.w3.org/TR/REC-html40/strict.dtd\">\n"
 "<html><head><meta name=\"qrichtext\" content=\"1\" /><meta charset=\"utf-8\" /><style type=\"text/css\">\n"
 "p, li { white-space: pre-wrap; }\n"
@@ -363,18 +315,6 @@ class Ui_MainWindow(object):
         self.button_remove_row.setText(QCoreApplication.translate("MainWindow", u"\u0412\u0438\u0434\u0430\u043b\u0438\u0442\u0438 \u0440\u044f\u0434\u043a\u0438", None))
         self.label_Sdw.setText(QCoreApplication.translate("MainWindow", u"S\u0436\u0438\u0442\u043b\u043e\u0432\u0430", None))
         self.tabWidget.setTabText(self.tabWidget.indexOf(self.tab), QCoreApplication.translate("MainWindow", u"\u0414\u0456\u043b\u044f\u043d\u043a\u0430", None))
-        ___qtablewidgetitem6 = self.tableWidget_n.horizontalHeaderItem(0)
-        ___qtablewidgetitem6.setText(QCoreApplication.translate("MainWindow", u"\u041d\u043e\u043c\u0435\u0440", None))
-        ___qtablewidgetitem7 = self.tableWidget_n.horizontalHeaderItem(1)
-        ___qtablewidgetitem7.setText(QCoreApplication.translate("MainWindow", u"\u0428\u0438\u0440\u0438\u043d\u0430", None))
-        ___qtablewidgetitem8 = self.tableWidget_n.horizontalHeaderItem(2)
-        ___qtablewidgetitem8.setText(QCoreApplication.translate("MainWindow", u"\u0414\u043e\u0432\u0436\u0438\u043d\u0430", None))
-        ___qtablewidgetitem9 = self.tableWidget_n.horizontalHeaderItem(3)
-        ___qtablewidgetitem9.setText(QCoreApplication.translate("MainWindow", u"\u0412\u0438\u0441\u043e\u0442\u0430", None))
-        ___qtablewidgetitem10 = self.tableWidget_n.horizontalHeaderItem(4)
-        ___qtablewidgetitem10.setText(QCoreApplication.translate("MainWindow", u"\u041f\u043b\u043e\u0449\u0430", None))
-        ___qtablewidgetitem11 = self.tableWidget_n.horizontalHeaderItem(5)
-        ___qtablewidgetitem11.setText(QCoreApplication.translate("MainWindow", u"\u041e\u0431'\u0454\u043c", None))
         self.area_dwelling_n.setHtml(QCoreApplication.translate("MainWindow", u"<!DOCTYPE HTML PUBLIC \"-//W3C//DTD HTML 4.0//EN\" \"http://www.w3.org/TR/REC-html40/strict.dtd\">\n"
 "<html><head><meta name=\"qrichtext\" content=\"1\" /><meta charset=\"utf-8\" /><style type=\"text/css\">\n"
 "p, li { white-space: pre-wrap; }\n"